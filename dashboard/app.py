@@ -6,15 +6,17 @@ Premium storytelling dashboard - Main page
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
 import plotly.express as px
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import sys
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent))
 
-from data_loader import DataLoader, MetricsCalculator, format_number, format_percentage
+from data_loader import DataLoader, MetricsCalculator, format_number, format_percentage, slice_date_range
 
 # Page config
 st.set_page_config(
@@ -106,107 +108,167 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data
+# The loader and the loaded datasets are cached with cache_resource so reruns
+# get the same objects back without st.cache_data's pickle/hash round-trip.
+# The frames are shared across sessions, so callers must not mutate them in
+# place (the date filter below always builds new frames).
+@st.cache_resource(show_spinner=False)
+def _get_loader():
+    return DataLoader()
+
+
+@st.cache_resource(show_spinner=False)
+def _load_datasets():
+    # The three loads are independent and spend most of their time in
+    # polars/pyarrow, which release the GIL, so run them side by side
+    loader = _get_loader()
+    loads = {
+        'invitations': loader.load_invitations,
+        'connections': loader.load_connections,
+        'messages': loader.load_messages
+    }
+    with ThreadPoolExecutor(max_workers=len(loads)) as executor:
+        futures = {name: executor.submit(load) for name, load in loads.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
 def load_all_data():
     """Load all datasets with caching"""
-    loader = DataLoader()
-    return {
-        'invitations': loader.load_invitations(),
-        'connections': loader.load_connections(),
-        'messages': loader.load_messages()
-    }
+    return dict(_load_datasets())
 
 
-def main():
-    # Load data
-    data = load_all_data()
+def filter_data(data, start_date, end_date):
+    """Return a copy of data with every dataset limited to start_date..end_date"""
+    # Frames are sorted by date at load time, so each filter is a
+    # searchsorted slice - end bound is exclusive midnight after end_date
+    start_ts = pd.Timestamp(start_date)
+    end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)
     
-    # ===== DATE FILTER IN SIDEBAR =====
-    st.sidebar.title("Filters")
+    filtered = dict(data)
     
-    # Get min and max dates from all datasets
-    all_dates = []
-    if len(data['invitations']) > 0:
-        all_dates.extend(data['invitations']['sent_at'].dropna().tolist())
-    if len(data['messages']) > 0:
-        all_dates.extend(data['messages']['date'].dropna().tolist())
+    # Filter invitations
+    filtered['invitations'] = slice_date_range(data['invitations'], 'sent_at', start_ts, end_ts)
     
-    if all_dates:
-        min_date = min(all_dates).date()
-        max_date = max(all_dates).date()
-        
-        # Date range selector
-        date_range = st.sidebar.date_input(
-            "Select Date Range",
-            value=(min_date, max_date),
-            min_value=min_date,
-            max_value=max_date,
-            help="Filter all data by date range"
-        )
-        
-        # Apply date filter
-        if isinstance(date_range, tuple) and len(date_range) == 2:
-            start_date, end_date = date_range
-            
-            # Filter invitations
-            data['invitations'] = data['invitations'][
-                (data['invitations']['sent_at'].dt.date >= start_date) &
-                (data['invitations']['sent_at'].dt.date <= end_date)
-            ]
-            
-            # Filter connections
-            if len(data['connections']) > 0 and 'connected_on' in data['connections'].columns:
-                data['connections'] = data['connections'][
-                    (data['connections']['connected_on'].dt.date >= start_date) &
-                    (data['connections']['connected_on'].dt.date <= end_date)
-                ]
-            
-            # Filter messages
-            data['messages'] = data['messages'][
-                (data['messages']['date'].dt.date >= start_date) &
-                (data['messages']['date'].dt.date <= end_date)
-            ]
-            
-            # Show filter info
-            st.sidebar.success(f"Showing data from {start_date} to {end_date}")
-            st.sidebar.metric("Days in Range", (end_date - start_date).days + 1)
-        else:
-            st.sidebar.warning("Please select both start and end dates")
+    # Filter connections
+    if len(data['connections']) > 0 and 'connected_on' in data['connections'].columns:
+        filtered['connections'] = slice_date_range(data['connections'], 'connected_on', start_ts, end_ts)
+    
+    # Filter messages
+    filtered['messages'] = slice_date_range(data['messages'], 'date', start_ts, end_ts)
     
-    # Calculate metrics
-    calc = MetricsCalculator()
-    funnel_metrics = calc.calculate_funnel_metrics(
-        data['invitations'], 
-        data['connections'], 
+    return filtered
+
+
+def _data_version():
+    """Cheap cache key that changes whenever the loaded datasets change"""
+    data = load_all_data()
+    date_bounds = _get_loader().date_bounds
+    return tuple((name, len(df), date_bounds.get(name)) for name, df in data.items())
+
+
+def _load_filtered(start_date, end_date):
+    """Load all datasets, filtered to the date range when one is selected"""
+    data = load_all_data()
+    if start_date is None:
+        return data
+    return filter_data(data, start_date, end_date)
+
+
+# Derived results are cached on scalars only (date range + data version), so
+# reruns with an unchanged range skip both the filtering and the metrics and
+# Streamlit never has to hash a DataFrame argument.
+@st.cache_data(show_spinner=False)
+def _cached_funnel(start_date, end_date, data_version):
+    data = _load_filtered(start_date, end_date)
+    return MetricsCalculator.calculate_funnel_metrics(
+        data['invitations'],
+        data['connections'],
         data['messages']
     )
+
+
+@st.cache_data(show_spinner=False)
+def _cached_timeseries(start_date, end_date, data_version):
+    invitations = _load_filtered(start_date, end_date)['invitations']
+    return MetricsCalculator.calculate_time_series(invitations, 'sent_at', freq='M')
+
+
+# Plotly figures are cached as JSON keyed on the plotted values, so reruns
+# skip figure construction and validation when the numbers haven't changed.
+@st.cache_data(show_spinner=False)
+def _funnel_figure_json(counts):
+    fig_funnel = go.Figure(go.Funnel(
+        y=['Invitations Sent', 'Connections Made', 'Conversations Started', 'Positive Outcomes'],
+        x=list(counts),
+        textposition="inside",
+        textinfo="value+percent initial",
+        marker=dict(
+            color=['#0A66C2', '#1B75D0', '#3B8FE8', '#5BA7F5'],
+            line=dict(width=0)
+        ),
+        connector=dict(line=dict(color="white", width=3))
+    ))
     
-    # ===== HERO SECTION =====
-    st.markdown("<h1 style='text-align: center; color: #0A66C2; font-size: 3rem; margin-bottom: 0;'>LinkedIn Networking Analytics</h1>", unsafe_allow_html=True)
-    st.markdown("<p style='text-align: center; font-size: 1.2rem; color: #666; margin-bottom: 3rem;'>Data-Driven Analysis of Professional Networking Effectiveness</p>", unsafe_allow_html=True)
-    
-    # ===== THE STORY INTRODUCTION =====
-    st.markdown("<div class='section-header'>The Story</div>", unsafe_allow_html=True)
-    
-    st.markdown(f"""
-    <div class='story-text'>
-    Professional networking is often treated as a numbers game—send enough connection requests, 
-    and success will follow. But <span class='highlight'>what if we could measure it scientifically?</span>
-    
-    <br><br>
+    fig_funnel.update_layout(
+        height=400,
+        margin=dict(l=20, r=20, t=20, b=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=14, color='#2C2C2C')
+    )
     
-    This dashboard analyzes <span class='highlight'>{format_number(len(data['invitations']))}</span> LinkedIn interactions 
-    to uncover patterns in networking effectiveness. By treating networking as a measurable funnel, 
-    we can identify what works, what doesn't, and how to optimize for better outcomes.
+    return fig_funnel.to_json()
+
+
+@st.cache_data(show_spinner=False)
+def _timeline_figure_json(periods, counts, cumulative):
+    fig_timeline = go.Figure()
+    
+    # Add bars for monthly activity
+    fig_timeline.add_trace(go.Bar(
+        x=list(periods),
+        y=list(counts),
+        name='Monthly Invitations',
+        marker_color='#0A66C2',
+        yaxis='y'
+    ))
     
-    <br><br>
+    # Add line for cumulative growth
+    fig_timeline.add_trace(go.Scatter(
+        x=list(periods),
+        y=list(cumulative),
+        name='Cumulative Total',
+        mode='lines+markers',
+        line=dict(color='#057642', width=3),
+        marker=dict(size=8),
+        yaxis='y2'
+    ))
     
-    <strong>The Question:</strong> Does strategic networking actually lead to meaningful professional outcomes?
-    <br>
-    <strong>The Answer:</strong> Let the data tell the story.
-    </div>
-    """, unsafe_allow_html=True)
+    fig_timeline.update_layout(
+        height=400,
+        xaxis=dict(title='Month', tickangle=-45),
+        yaxis=dict(title=dict(text='Monthly Invitations', font=dict(color='#0A66C2'))),
+        yaxis2=dict(
+            title=dict(text='Cumulative Total', font=dict(color='#057642')),
+            overlaying='y',
+            side='right'
+        ),
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=20, r=20, t=40, b=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12, color='#2C2C2C')
+    )
     
+    return fig_timeline.to_json()
+
+
+# Each section is a fragment: interactions with widgets inside a section rerun
+# only that section, and the date filter (a full rerun) refreshes all of them
+# from the cached metrics.
+@st.fragment
+def render_kpis(funnel_metrics):
     # ===== KEY INSIGHTS (Top-level metrics) =====
     st.markdown("<div class='section-header'>Key Performance Indicators</div>", unsafe_allow_html=True)
     
@@ -244,7 +306,10 @@ def main():
         )
     
     st.markdown("<br>", unsafe_allow_html=True)
-    
+
+
+@st.fragment
+def render_funnel(funnel_metrics):
     # ===== THE NETWORKING FUNNEL =====
     st.markdown("<div class='section-header'>The Networking Funnel</div>", unsafe_allow_html=True)
     
@@ -255,40 +320,14 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Funnel visualization
-    funnel_data = {
-        'Stage': ['Invitations Sent', 'Connections Made', 'Conversations Started', 'Positive Outcomes'],
-        'Count': [
-            funnel_metrics['invitations_sent'],
-            funnel_metrics['connections_made'],
-            funnel_metrics['conversations'],
-            funnel_metrics['outcomes']
-        ],
-        'Percentage': [100, 
-                      funnel_metrics['acceptance_rate'],
-                      funnel_metrics['message_rate'],
-                      funnel_metrics['outcome_rate']]
-    }
-    
-    fig_funnel = go.Figure(go.Funnel(
-        y=funnel_data['Stage'],
-        x=funnel_data['Count'],
-        textposition="inside",
-        textinfo="value+percent initial",
-        marker=dict(
-            color=['#0A66C2', '#1B75D0', '#3B8FE8', '#5BA7F5'],
-            line=dict(width=0)
-        ),
-        connector=dict(line=dict(color="white", width=3))
-    ))
-    
-    fig_funnel.update_layout(
-        height=400,
-        margin=dict(l=20, r=20, t=20, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(size=14, color='#2C2C2C')
+    # Funnel visualization (figure JSON cached per stage counts)
+    funnel_counts = (
+        funnel_metrics['invitations_sent'],
+        funnel_metrics['connections_made'],
+        funnel_metrics['conversations'],
+        funnel_metrics['outcomes']
     )
+    fig_funnel = pio.from_json(_funnel_figure_json(funnel_counts))
     
     st.plotly_chart(fig_funnel, use_container_width=True)
     
@@ -322,7 +361,10 @@ def main():
         <p>Every 100 connections made result in approximately <strong>{int(overall_efficiency)}</strong> meaningful professional outcomes.</p>
         </div>
         """, unsafe_allow_html=True)
-    
+
+
+@st.fragment
+def render_timeline(ts_data):
     # ===== NETWORK GROWTH TIMELINE =====
     st.markdown("<div class='section-header'>Network Growth Over Time</div>", unsafe_allow_html=True)
     
@@ -334,49 +376,88 @@ def main():
     """, unsafe_allow_html=True)
     
     # Time series for invitations
-    if len(data['invitations']) > 0:
-        ts_data = calc.calculate_time_series(data['invitations'], 'sent_at', freq='M')
-        
-        fig_timeline = go.Figure()
-        
-        # Add bars for monthly activity
-        fig_timeline.add_trace(go.Bar(
-            x=ts_data['period'],
-            y=ts_data['count'],
-            name='Monthly Invitations',
-            marker_color='#0A66C2',
-            yaxis='y'
+    if ts_data is not None:
+        fig_timeline = pio.from_json(_timeline_figure_json(
+            tuple(ts_data['period']), tuple(ts_data['count']), tuple(ts_data['cumulative'])
         ))
         
-        # Add line for cumulative growth
-        fig_timeline.add_trace(go.Scatter(
-            x=ts_data['period'],
-            y=ts_data['cumulative'],
-            name='Cumulative Total',
-            mode='lines+markers',
-            line=dict(color='#057642', width=3),
-            marker=dict(size=8),
-            yaxis='y2'
-        ))
+        st.plotly_chart(fig_timeline, use_container_width=True)
+
+
+def main():
+    # Load data
+    data = load_all_data()
+    
+    # ===== DATE FILTER IN SIDEBAR =====
+    st.sidebar.title("Filters")
+    
+    start_date = end_date = None
+    
+    # Get min and max dates from the bounds recorded at load time
+    date_bounds = _get_loader().date_bounds
+    bounds = [date_bounds[name] for name in ('invitations', 'messages') if date_bounds.get(name)]
+    
+    if bounds:
+        min_date = min(lo for lo, _ in bounds).date()
+        max_date = max(hi for _, hi in bounds).date()
         
-        fig_timeline.update_layout(
-            height=400,
-            xaxis=dict(title='Month', tickangle=-45),
-            yaxis=dict(title=dict(text='Monthly Invitations', font=dict(color='#0A66C2'))),
-            yaxis2=dict(
-                title=dict(text='Cumulative Total', font=dict(color='#057642')),
-                overlaying='y',
-                side='right'
-            ),
-            hovermode='x unified',
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            margin=dict(l=20, r=20, t=40, b=20),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(size=12, color='#2C2C2C')
+        # Date range selector
+        date_range = st.sidebar.date_input(
+            "Select Date Range",
+            value=(min_date, max_date),
+            min_value=min_date,
+            max_value=max_date,
+            help="Filter all data by date range"
         )
         
-        st.plotly_chart(fig_timeline, use_container_width=True)
+        # Apply date filter
+        if isinstance(date_range, tuple) and len(date_range) == 2:
+            start_date, end_date = date_range
+            data = filter_data(data, start_date, end_date)
+            
+            # Show filter info
+            st.sidebar.success(f"Showing data from {start_date} to {end_date}")
+            st.sidebar.metric("Days in Range", (end_date - start_date).days + 1)
+        else:
+            st.sidebar.warning("Please select both start and end dates")
+    
+    # Calculate metrics (cached per date range)
+    data_version = _data_version()
+    funnel_metrics = _cached_funnel(start_date, end_date, data_version)
+    
+    # ===== HERO SECTION =====
+    st.markdown("<h1 style='text-align: center; color: #0A66C2; font-size: 3rem; margin-bottom: 0;'>LinkedIn Networking Analytics</h1>", unsafe_allow_html=True)
+    st.markdown("<p style='text-align: center; font-size: 1.2rem; color: #666; margin-bottom: 3rem;'>Data-Driven Analysis of Professional Networking Effectiveness</p>", unsafe_allow_html=True)
+    
+    # ===== THE STORY INTRODUCTION =====
+    st.markdown("<div class='section-header'>The Story</div>", unsafe_allow_html=True)
+    
+    st.markdown(f"""
+    <div class='story-text'>
+    Professional networking is often treated as a numbers game—send enough connection requests, 
+    and success will follow. But <span class='highlight'>what if we could measure it scientifically?</span>
+    
+    <br><br>
+    
+    This dashboard analyzes <span class='highlight'>{format_number(len(data['invitations']))}</span> LinkedIn interactions 
+    to uncover patterns in networking effectiveness. By treating networking as a measurable funnel, 
+    we can identify what works, what doesn't, and how to optimize for better outcomes.
+    
+    <br><br>
+    
+    <strong>The Question:</strong> Does strategic networking actually lead to meaningful professional outcomes?
+    <br>
+    <strong>The Answer:</strong> Let the data tell the story.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    render_kpis(funnel_metrics)
+    
+    render_funnel(funnel_metrics)
+    
+    # Time series for invitations
+    ts_data = _cached_timeseries(start_date, end_date, data_version) if len(data['invitations']) > 0 else None
+    render_timeline(ts_data)
     
     # ===== WHAT'S NEXT =====
     st.markdown("<div class='section-header'>Dive Deeper</div>", unsafe_allow_html=True)
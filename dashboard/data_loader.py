@@ -3,11 +3,171 @@ LinkedIn Networking Analytics - Data Loader & Metrics Calculator
 Premium quality data processing for dashboard
 """
 
+import os
+import csv
 import pandas as pd
 import numpy as np
+import polars as pl
+import pyarrow.parquet as pq
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 
+
+# Columns the dashboard actually reads - everything else is skipped at parse time.
+# The cleaned CSVs (schema in the main README) store dates as ISO 8601: sent_at
+# and connected_on naive, message dates with a +00:00 offset (made naive UTC by
+# _naive_datetime). PII arrives only as *_hash columns, which are never read.
+INVITATION_COLS = ['sent_at', 'direction']
+MESSAGE_COLS = [
+    'conversation_id', 'from', 'to', 'date',
+    'has_referral_keyword', 'has_interview_keyword',
+    'has_positive_keyword', 'has_negative_keyword'
+]
+KEYWORD_FLAG_COLS = MESSAGE_COLS[4:]
+
+INVITATION_DTYPES = {'direction': pl.Categorical}
+MESSAGE_DTYPES = {col: pl.Int8 for col in KEYWORD_FLAG_COLS}
+
+# Keyword flag -> calculate_engagement_metrics key
+ENGAGEMENT_FLAGS = [
+    ('has_referral_keyword', 'has_referrals'),
+    ('has_interview_keyword', 'has_interviews'),
+    ('has_positive_keyword', 'positive_sentiment'),
+    ('has_negative_keyword', 'negative_sentiment')
+]
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+DAY_DTYPE = pd.CategoricalDtype(DAY_ORDER, ordered=True)
+
+
+def _csv_header(csv_path):
+    """Read just the header row of a CSV"""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+
+def _read_csv(csv_path, columns=None, date_col=None, dtypes=None):
+    """Parse the given columns of a cleaned CSV with polars and return a pandas frame
+    
+    Columns missing from the file are ignored; if none of them exist every
+    column is read so the row count is still correct.
+    """
+    present = [col for col in _csv_header(csv_path) if columns is None or col in columns]
+    overrides = {col: dtype for col, dtype in (dtypes or {}).items() if col in present}
+    frame = pl.read_csv(
+        csv_path,
+        columns=present or None,
+        schema_overrides=overrides,
+        infer_schema_length=None
+    )
+    return _to_pandas(frame, date_col)
+
+
+def _to_pandas(frame, date_col=None):
+    """Convert a polars frame to pandas, parsing date_col as tz-naive datetime"""
+    if date_col is None or date_col not in frame.columns:
+        return frame.to_pandas()
+    try:
+        frame = frame.with_columns(
+            pl.col(date_col).str.to_datetime(time_unit='ns').dt.replace_time_zone(None)
+        )
+        return frame.to_pandas()
+    except pl.exceptions.PolarsError:
+        # Formats polars can't infer (e.g. "... UTC" suffixes) fall back to pandas,
+        # parsed straight to UTC so mixed offsets still land in one datetime64 column
+        df = frame.to_pandas()
+        df[date_col] = pd.to_datetime(df[date_col], utc=True).dt.tz_localize(None)
+        return df
+
+
+def _naive_datetime(df, date_col):
+    """Make date_col tz-naive datetime64 (UTC wall time) if it isn't already
+    
+    Parquet files written by the ETL may store dates tz-aware or, when parsing
+    failed there, as strings; frames parsed here are already naive.
+    """
+    if date_col is None or date_col not in df.columns:
+        return df
+    dates = df[date_col]
+    if pd.api.types.is_datetime64_dtype(dates.dtype):
+        return df
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_convert('UTC')
+    else:
+        dates = pd.to_datetime(dates, utc=True, errors='coerce')
+    return df.assign(**{date_col: dates.dt.tz_localize(None)})
+
+
+def _sort_by_date(df, date_col):
+    """Sort rows by date_col (NaT last) so date ranges can be sliced with searchsorted"""
+    if date_col is None or date_col not in df.columns:
+        return df
+    return df.sort_values(date_col, kind='stable', ignore_index=True)
+
+
+def _connection_date_col(columns):
+    """Find the connections date column (could be 'connected_on' or similar)"""
+    date_cols = [col for col in columns if 'date' in col.lower() or 'connected' in col.lower()]
+    return date_cols[0] if date_cols else None
+
+
+def _categorize_people(df):
+    """Cast from/to to one shared categorical dtype so their codes are comparable"""
+    if 'from' not in df.columns or 'to' not in df.columns:
+        return df
+    people = pd.CategoricalDtype(pd.unique(pd.concat([df['from'], df['to']]).dropna()))
+    return df.astype({'from': people, 'to': people})
+
+
+def _categorize(df, columns):
+    """Cast low-cardinality string columns to category (no-op if already categorical)"""
+    todo = {col: 'category' for col in columns
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)}
+    return df.astype(todo) if todo else df
+
+
+def _flags_to_bool(df):
+    """Store the 0/1 keyword flag columns as bool (missing values count as 0)"""
+    flags = [col for col in KEYWORD_FLAG_COLS if col in df.columns]
+    if not flags:
+        return df
+    return df.assign(**{col: df[col].eq(1) for col in flags})
+
+
+def _add_timing_columns(df, date_col):
+    """Add day_of_week (ordered Monday..Sunday categorical) and hour (Int8) from date_col"""
+    if date_col not in df.columns:
+        return df
+    dates = df[date_col].dt
+    return df.assign(
+        day_of_week=dates.day_name().astype(DAY_DTYPE),
+        hour=dates.hour.astype('Int8')  # nullable: undated rows stay <NA>
+    )
+
+
+def _date_bounds(df, date_col):
+    """Return (min, max) of date_col as scalars, or None if it has no dates"""
+    if date_col is None or date_col not in df.columns:
+        return None
+    dates = df[date_col]
+    lo, hi = dates.min(), dates.max()
+    return None if pd.isna(lo) else (lo, hi)
+
+
+def slice_date_range(df, date_col, start, end):
+    """Return rows with start <= date_col < end from a frame sorted by date_col
+    
+    Two binary searches replace a full boolean scan; the result is a positional
+    slice of the original frame.
+    """
+    dates = df[date_col]
+    lo = dates.searchsorted(start, side='left')
+    hi = dates.searchsorted(end, side='left')
+    return df.iloc[lo:hi]
+
+
 class DataLoader:
     """Load and cache cleaned LinkedIn data"""
     
@@ -17,35 +177,208 @@ class DataLoader:
             current_dir = Path(__file__).parent
             data_dir = current_dir.parent / "data" / "cleaned"
         self.data_dir = Path(data_dir)
+        # (min, max) date per dataset, filled in by the load_* methods
+        self.date_bounds = {}
+    
+    @staticmethod
+    def _load_or_convert(csv_path, parse_csv, columns=None):
+        """Load the parquet sibling of csv_path, rebuilding it with parse_csv when stale
         
-    def load_invitations(self):
-        """Load invitations data"""
-        df = pd.read_csv(self.data_dir / "invitations_cleaned.csv")
-        df['sent_at'] = pd.to_datetime(df['sent_at']).dt.tz_localize(None)
+        The sibling is either written by the ETL (save_cleaned_data) or cached
+        here on first load.
+        
+        When columns is given only those are read back from the parquet file
+        (a cache written by an older version may hold more).
+        """
+        parquet_path = csv_path.with_suffix('.parquet')
+        if parquet_path.exists() and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            stored = pq.read_schema(parquet_path).names
+            present = [col for col in stored if columns is None or col in columns]
+            return pd.read_parquet(parquet_path, engine='pyarrow', columns=present or None)
+        
+        df = parse_csv(csv_path)
+        try:
+            df.to_parquet(parquet_path, engine='pyarrow', compression='snappy')
+        except (OSError, ValueError, TypeError):
+            pass  # Cache is best-effort (e.g. read-only data dir)
         return df
     
+    @staticmethod
+    def _parse_invitations(csv_path):
+        return _read_csv(csv_path, INVITATION_COLS, 'sent_at', INVITATION_DTYPES)
+    
+    @staticmethod
+    def _parse_connections(csv_path):
+        # Only the date column is used (row count comes along with it)
+        date_col = _connection_date_col(_csv_header(csv_path))
+        return _read_csv(csv_path, [date_col] if date_col else None, date_col)
+    
+    @staticmethod
+    def _parse_messages(csv_path):
+        return _read_csv(csv_path, MESSAGE_COLS, 'date', MESSAGE_DTYPES)
+    
+    def load_invitations(self):
+        """Load invitations data, sorted by sent_at, with direction as a categorical"""
+        df = self._load_or_convert(
+            self.data_dir / "invitations_cleaned.csv", self._parse_invitations, INVITATION_COLS
+        )
+        df = _naive_datetime(df, 'sent_at')
+        self.date_bounds['invitations'] = _date_bounds(df, 'sent_at')
+        return _categorize(_sort_by_date(df, 'sent_at'), ['direction'])
+    
     def load_connections(self):
-        """Load connections data - with fallback handling"""
+        """Load connections data, sorted by connection date - with fallback handling"""
+        csv_path = self.data_dir / "connections_cleaned.csv"
         try:
-            df = pd.read_csv(self.data_dir / "connections_cleaned.csv")
-            # Find the date column (could be 'connected_on' or similar)
-            date_cols = [col for col in df.columns if 'date' in col.lower() or 'connected' in col.lower()]
-            if date_cols:
-                df[date_cols[0]] = pd.to_datetime(df[date_cols[0]]).dt.tz_localize(None)
-            return df
+            # Only the date column is used - project the parquet read to it too
+            date_col = _connection_date_col(_csv_header(csv_path))
+            df = self._load_or_convert(
+                csv_path, self._parse_connections, [date_col] if date_col else None
+            )
         except FileNotFoundError:
             return pd.DataFrame()  # Return empty if not available
+        date_col = _connection_date_col(df.columns)
+        df = _naive_datetime(df, date_col)
+        self.date_bounds['connections'] = _date_bounds(df, date_col)
+        return _sort_by_date(df, date_col)
     
     def load_messages(self):
-        """Load messages data"""
-        df = pd.read_csv(self.data_dir / "messages_cleaned.csv")
-        df['date'] = pd.to_datetime(df['date']).dt.tz_localize(None)
-        return df
+        """Load messages data, sorted by date, with from/to as categoricals, bool keyword
+        flags and precomputed day_of_week/hour columns"""
+        df = self._load_or_convert(
+            self.data_dir / "messages_cleaned.csv", self._parse_messages, MESSAGE_COLS
+        )
+        df = _naive_datetime(df, 'date')
+        self.date_bounds['messages'] = _date_bounds(df, 'date')
+        df = _flags_to_bool(_categorize_people(_sort_by_date(df, 'date')))
+        return _add_timing_columns(df, 'date')
+
+
+def _flag_mask(df, col):
+    """Keyword flag column as a NumPy boolean mask"""
+    values = df[col].to_numpy()
+    # Bool flags (as loaded by DataLoader) are already the mask
+    return values if values.dtype == bool else values == 1
+
+
+@dataclass(frozen=True)
+class MessageSummary:
+    """Per-user message aggregates shared by the funnel and response metrics"""
+    total_messages: int
+    messages_sent: int
+    messages_received: int
+    unique_people_messaged: int
+    unique_repliers: int
+    outcomes: int
+
+
+@dataclass(frozen=True)
+class NetworkSummary:
+    """Aggregates behind the Network Insights page"""
+    total_invitations: int
+    direction_counts: dict       # invitation direction -> count (None without a direction column)
+    total_messages: int
+    monthly_messages: pd.Series  # messages per month, indexed by month start
+    top_partners: pd.Series      # most messaged people (excluding the user), largest first
+    keyword_sums: dict           # keyword flag column -> number of flagged messages
 
 
 class MetricsCalculator:
     """Calculate key networking metrics"""
     
+    @staticmethod
+    def summarize_messages(messages_df, user_name="Rohan Shrestha"):
+        """Compute every messages-derived count in one pass over the frame
+        
+        The from/to scans and keyword masks are built once here and shared by
+        calculate_funnel_metrics and calculate_response_metrics.
+        """
+        senders = messages_df['from']
+        recipients = messages_df['to']
+        sent = (senders == user_name).to_numpy()
+        received = (recipients == user_name).to_numpy()
+        
+        # Unique people you messaged (recipients of your messages)
+        sent_to = recipients[sent]
+        unique_people_messaged = sent_to.nunique()
+        
+        # Unique people who replied to you
+        # (people who sent you messages AND you had sent them messages)
+        unique_repliers = 0
+        if unique_people_messaged > 0:
+            received_from = senders[received]
+            if (isinstance(senders.dtype, pd.CategoricalDtype)
+                    and senders.dtype == recipients.dtype):
+                # Shared categories (see DataLoader.load_messages) - match on integer codes
+                sent_to, received_from = sent_to.cat.codes, received_from.cat.codes
+                sent_to, received_from = sent_to[sent_to >= 0], received_from[received_from >= 0]
+            unique_repliers = np.intersect1d(
+                sent_to.dropna().unique(), received_from.dropna().unique(), assume_unique=True
+            ).size
+        
+        # Positive outcomes (unique conversations with referral/interview keywords)
+        outcomes = 0
+        if 'has_referral_keyword' in messages_df.columns and 'has_interview_keyword' in messages_df.columns:
+            outcome_mask = _flag_mask(messages_df, 'has_referral_keyword') | _flag_mask(messages_df, 'has_interview_keyword')
+            if 'conversation_id' in messages_df.columns:
+                # Count unique conversations, not individual messages
+                outcomes = messages_df['conversation_id'][outcome_mask].nunique()
+            else:
+                # Fallback to message count if no conversation_id
+                outcomes = int(outcome_mask.sum())
+        
+        return MessageSummary(
+            total_messages=len(messages_df),
+            messages_sent=int(sent.sum()),
+            messages_received=int(received.sum()),
+            unique_people_messaged=unique_people_messaged,
+            unique_repliers=unique_repliers,
+            outcomes=outcomes
+        )
+    
+    @staticmethod
+    def summarize_network(invitations_df, messages_df, user_name="Rohan Shrestha", top_n=10):
+        """Compute the invitation and messaging aggregates for the Network Insights page"""
+        invitation_cols = frozenset(invitations_df.columns)
+        message_cols = frozenset(messages_df.columns)
+        
+        direction_counts = None
+        if 'direction' in invitation_cols:
+            counts = invitations_df['direction'].value_counts()
+            direction_counts = {str(direction): int(n) for direction, n in counts.items() if n > 0}
+        
+        monthly_messages = pd.Series(dtype='int64')
+        top_partners = pd.Series(dtype='int64')
+        if len(messages_df) > 0:
+            # Truncate to month with a NumPy cast - no per-row Period objects
+            dates = messages_df['date']
+            monthly_messages = dates.groupby(dates.to_numpy().astype('datetime64[M]')).size()
+            
+            # Count messages per person (both from and to) in one pass, excluding self
+            people = pd.concat([messages_df['from'], messages_df['to']], ignore_index=True)
+            name_counts = people.value_counts(sort=False).drop(user_name, errors='ignore')
+            
+            # Partial selection, no full sort of every person
+            top_partners = name_counts.nlargest(top_n)
+            # Categorical value_counts also lists people with no messages in range
+            top_partners = top_partners[top_partners > 0]
+        
+        # One count_nonzero over all flag columns together (bool as loaded, else == 1)
+        flags = [col for col in KEYWORD_FLAG_COLS if col in message_cols]
+        sums = []
+        if flags:
+            values = messages_df[flags].to_numpy()
+            sums = np.count_nonzero(values if values.dtype == bool else values == 1, axis=0)
+        
+        return NetworkSummary(
+            total_invitations=len(invitations_df),
+            direction_counts=direction_counts,
+            total_messages=len(messages_df),
+            monthly_messages=monthly_messages,
+            top_partners=top_partners,
+            keyword_sums={col: int(n) for col, n in zip(flags, sums)}
+        )
+    
     @staticmethod
     def calculate_funnel_metrics(invitations_df, connections_df, messages_df, user_name="Rohan Shrestha"):
         """Calculate complete funnel metrics
@@ -58,30 +391,15 @@ class MetricsCalculator:
         """
         
         # Invitations sent (outgoing only)
-        invitations_sent = len(invitations_df[invitations_df['direction'] == 'OUTGOING']) if 'direction' in invitations_df.columns else len(invitations_df)
+        invitations_sent = int((invitations_df['direction'] == 'OUTGOING').sum()) if 'direction' in invitations_df.columns else len(invitations_df)
         
         # Connections made (use real connections data)
         connections_made = len(connections_df) if len(connections_df) > 0 else 0
         
-        # Conversations initiated - count unique people you messaged
-        messages_you_sent = messages_df[messages_df['from'] == user_name]
-        unique_people_messaged = messages_you_sent['to'].nunique() if len(messages_you_sent) > 0 else 0
-        
-        # Positive outcomes (unique conversations with referral/interview keywords)
-        outcomes = 0
-        if 'has_referral_keyword' in messages_df.columns and 'has_interview_keyword' in messages_df.columns:
-            if 'conversation_id' in messages_df.columns:
-                # Count unique conversations, not individual messages
-                outcomes = messages_df[
-                    (messages_df['has_referral_keyword'] == 1) | 
-                    (messages_df['has_interview_keyword'] == 1)
-                ]['conversation_id'].nunique()
-            else:
-                # Fallback to message count if no conversation_id
-                outcomes = len(messages_df[
-                    (messages_df['has_referral_keyword'] == 1) | 
-                    (messages_df['has_interview_keyword'] == 1)
-                ])
+        # Conversations initiated and positive outcomes
+        summary = MetricsCalculator.summarize_messages(messages_df, user_name)
+        unique_people_messaged = summary.unique_people_messaged
+        outcomes = summary.outcomes
         
         return {
             'invitations_sent': invitations_sent,
@@ -103,29 +421,18 @@ class MetricsCalculator:
             - response_rate: Percentage of people who replied (unique repliers / unique people messaged)
         """
         
-        # Get all messages you sent
-        messages_you_sent = messages_df[messages_df['from'] == user_name]
-        
-        # Count unique people you messaged (recipients)
-        unique_people_messaged = messages_you_sent['to'].nunique() if len(messages_you_sent) > 0 else 0
-        
-        # Count unique people who replied to you
-        # (people who sent you messages AND you had sent them messages)
-        people_who_replied = messages_df[
-            (messages_df['to'] == user_name) & 
-            (messages_df['from'].isin(messages_you_sent['to']))
-        ]['from'].nunique() if len(messages_you_sent) > 0 else 0
+        summary = MetricsCalculator.summarize_messages(messages_df, user_name)
         
         # Response rate: % of unique people who replied
-        response_rate = (people_who_replied / unique_people_messaged * 100) if unique_people_messaged > 0 else 0
+        response_rate = (summary.unique_repliers / summary.unique_people_messaged * 100) if summary.unique_people_messaged > 0 else 0
         
         return {
-            'unique_people_messaged': unique_people_messaged,
-            'unique_repliers': people_who_replied,
+            'unique_people_messaged': summary.unique_people_messaged,
+            'unique_repliers': summary.unique_repliers,
             'response_rate': response_rate,
-            'total_messages': len(messages_df),
-            'messages_sent': len(messages_you_sent),
-            'messages_received': len(messages_df[messages_df['to'] == user_name])
+            'total_messages': summary.total_messages,
+            'messages_sent': summary.messages_sent,
+            'messages_received': summary.messages_received
         }
     
     @staticmethod
@@ -141,41 +448,20 @@ class MetricsCalculator:
         }
         
         # Count unique conversations with outcome keywords, not total messages
+        # (fallback: count messages if conversation_id not available)
+        codes = None
         if 'conversation_id' in messages_df.columns:
-            if 'has_referral_keyword' in messages_df.columns:
-                metrics['has_referrals'] = messages_df[messages_df['has_referral_keyword'] == 1]['conversation_id'].nunique()
-            
-            if 'has_interview_keyword' in messages_df.columns:
-                metrics['has_interviews'] = messages_df[messages_df['has_interview_keyword'] == 1]['conversation_id'].nunique()
-            
-            if 'has_positive_keyword' in messages_df.columns:
-                metrics['positive_sentiment'] = messages_df[messages_df['has_positive_keyword'] == 1]['conversation_id'].nunique()
-            
-            if 'has_negative_keyword' in messages_df.columns:
-                metrics['negative_sentiment'] = messages_df[messages_df['has_negative_keyword'] == 1]['conversation_id'].nunique()
-        else:
-            # Fallback: count messages if conversation_id not available
-            if 'has_referral_keyword' in messages_df.columns:
-                metrics['has_referrals'] = messages_df['has_referral_keyword'].sum()
-            
-            if 'has_interview_keyword' in messages_df.columns:
-                metrics['has_interviews'] = messages_df['has_interview_keyword'].sum()
-            
-            if 'has_positive_keyword' in messages_df.columns:
-                metrics['positive_sentiment'] = messages_df['has_positive_keyword'].sum()
-            
-            if 'has_negative_keyword' in messages_df.columns:
-                metrics['negative_sentiment'] = messages_df['has_negative_keyword'].sum()
-        
-        return metrics
-        if 'has_interview_keyword' in messages_df.columns:
-            metrics['has_interviews'] = messages_df['has_interview_keyword'].sum()
-        
-        if 'has_positive_keyword' in messages_df.columns:
-            metrics['positive_sentiment'] = messages_df['has_positive_keyword'].sum()
-        
-        if 'has_negative_keyword' in messages_df.columns:
-            metrics['negative_sentiment'] = messages_df['has_negative_keyword'].sum()
+            # Factorize once; each flag is then a bincount over integer codes
+            codes, uniques = pd.factorize(messages_df['conversation_id'])
+            has_id = codes >= 0  # missing ids (-1) don't count, as in nunique
+        for col, key in ENGAGEMENT_FLAGS:
+            if col not in messages_df.columns:
+                continue
+            mask = _flag_mask(messages_df, col)
+            if codes is None:
+                metrics[key] = int(mask.sum())
+            else:
+                metrics[key] = np.count_nonzero(np.bincount(codes[mask & has_id], minlength=len(uniques)))
         
         return metrics
     
@@ -183,12 +469,15 @@ class MetricsCalculator:
     def calculate_time_series(df, date_col, freq='M'):
         """Calculate time series data for growth charts"""
         
-        df_ts = df.copy()
-        df_ts['period'] = df_ts[date_col].dt.to_period(freq)
+        # Bin on the datetime64 values directly - no frame copy or per-row Period objects
+        counts = df.groupby(pd.Grouper(key=date_col, freq=freq)).size()
         
-        # Count by period
-        ts_data = df_ts.groupby('period').size().reset_index(name='count')
-        ts_data['period'] = ts_data['period'].astype(str)
+        # Resampling emits empty bins; keep only periods with activity
+        counts = counts[counts > 0]
+        ts_data = pd.DataFrame({
+            'period': counts.index.to_period(freq).astype(str),
+            'count': counts.to_numpy()
+        })
         
         # Calculate cumulative
         ts_data['cumulative'] = ts_data['count'].cumsum()
@@ -211,6 +500,8 @@ class MetricsCalculator:
         }
 
 
+# KPI values repeat across reruns, so the formatted strings are memoized
+@lru_cache(maxsize=1024)
 def format_number(num):
     """Format numbers for display"""
     if num >= 1000:
@@ -218,6 +509,7 @@ def format_number(num):
     return f"{num:,.0f}"
 
 
+@lru_cache(maxsize=1024)
 def format_percentage(pct):
     """Format percentages for display"""
     return f"{pct:.1f}%"
@@ -5,18 +5,18 @@ Network Insights Page - Deep dive into connection patterns
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
 import plotly.express as px
 import sys
 from pathlib import Path
-from collections import Counter
 
 sys.path.append(str(Path(__file__).parent.parent))
-from data_loader import DataLoader, MetricsCalculator, format_number
+from data_loader import DataLoader, MetricsCalculator, format_number, slice_date_range
 
 st.set_page_config(page_title="Network Insights", page_icon="📈", layout="wide")
 
 # Apply same CSS
-st.markdown("""
+_CSS = """
 <style>
     #MainMenu {visibility: hidden;}
     footer {visibility: hidden;}
@@ -63,33 +63,129 @@ st.markdown("""
         margin-top: 0.5rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_CSS, unsafe_allow_html=True)
 
-@st.cache_data
-def load_all_data():
-    loader = DataLoader()
+# The loader and its datasets are cached with cache_resource (as in app.py) so
+# reruns get the same objects back instead of unpickled copies. The frames are
+# shared across sessions and must not be mutated in place.
+@st.cache_resource(show_spinner=False)
+def _get_loader():
+    return DataLoader()
+
+@st.cache_resource(show_spinner=False)
+def _load_datasets():
+    loader = _get_loader()
     return {
         'invitations': loader.load_invitations(),
         'connections': loader.load_connections(),
         'messages': loader.load_messages()
     }
 
-def main():
+def load_all_data():
+    """Load all datasets with caching (a new dict; the frames are shared)"""
+    return dict(_load_datasets())
+
+# Columns this page reads - filtered frames carry nothing else
+QUALITY_COLUMNS = ['has_referral_keyword', 'has_interview_keyword', 'has_positive_keyword']
+INVITATION_COLUMNS = ['sent_at', 'direction']
+MESSAGE_COLUMNS = ['date', 'from', 'to'] + QUALITY_COLUMNS
+QUALITY_COLUMN_SET = frozenset(QUALITY_COLUMNS)
+
+def _project(df, columns):
+    present = frozenset(df.columns)
+    return df[[col for col in columns if col in present]]
+
+# Not cached: build_summary, the only caller, is already cached per range
+def filter_by_date(start_date, end_date):
+    """Load the invitations and messages this page uses, limited to start_date..end_date"""
     data = load_all_data()
     
+    # Frames are sorted by date at load time, so each filter is a
+    # searchsorted slice - end bound is exclusive midnight after end_date
+    start_ts = pd.Timestamp(start_date)
+    end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+    
+    # Slicing rows is cheap; only the projected columns are copied
+    return {
+        'invitations': _project(slice_date_range(data['invitations'], 'sent_at', start_ts, end_ts), INVITATION_COLUMNS),
+        'messages': _project(slice_date_range(data['messages'], 'date', start_ts, end_ts), MESSAGE_COLUMNS)
+    }
+
+@st.cache_data(show_spinner=False)
+def build_summary(start_date=None, end_date=None):
+    """Aggregates for the selected date range (all data when no range), cached per range"""
+    data = load_all_data() if start_date is None else filter_by_date(start_date, end_date)
+    return MetricsCalculator.summarize_network(data['invitations'], data['messages'])
+
+# Figures are cached as JSON keyed on the aggregated values they plot, so
+# reruns that don't change the numbers skip building them again.
+@st.cache_data(show_spinner=False)
+def _direction_figure_json(outgoing, incoming):
+    fig_direction = go.Figure(data=[go.Pie(
+        labels=['Outgoing (You Initiated)', 'Incoming (They Reached Out)'],
+        values=[outgoing, incoming],
+        marker=dict(colors=['#0A66C2', '#5BA7F5']),
+        hole=0.4,
+        textinfo='label+percent+value',
+        textfont=dict(size=14)
+    )])
+    
+    fig_direction.update_layout(
+        height=400,
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5),
+        margin=dict(l=20, r=20, t=20, b=60),
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    
+    return fig_direction.to_json()
+
+@st.cache_data(show_spinner=False)
+def _messages_figure_json(months, counts):
+    fig_messages = go.Figure()
+    # WebGL trace - redraws stay cheap as the history grows
+    fig_messages.add_trace(go.Scattergl(
+        x=list(months),
+        y=list(counts),
+        mode='lines+markers',
+        line=dict(color='#0A66C2', width=3),
+        marker=dict(size=8),
+        fill='tozeroy',
+        fillcolor='rgba(10, 102, 194, 0.1)',
+        # Only month and count are useful on hover - no trace name label
+        hoverinfo='x+y'
+    ))
+    
+    fig_messages.update_layout(
+        title='Message Activity Over Time',
+        xaxis_title='Month',
+        yaxis_title='Messages',
+        height=350,
+        margin=dict(l=20, r=20, t=40, b=60),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(tickangle=-45)
+    )
+    
+    return fig_messages.to_json()
+
+def main():
+    # Loads the datasets on first run (which records their date bounds)
+    _load_datasets()
+    
     # ===== DATE FILTER IN SIDEBAR =====
     st.sidebar.title("Filters")
     
-    # Get min and max dates from all datasets
-    all_dates = []
-    if len(data['invitations']) > 0:
-        all_dates.extend(data['invitations']['sent_at'].dropna().tolist())
-    if len(data['messages']) > 0:
-        all_dates.extend(data['messages']['date'].dropna().tolist())
+    start_date = end_date = None
+    
+    # Get min and max dates from the bounds recorded at load time
+    date_bounds = _get_loader().date_bounds
+    bounds = [date_bounds[name] for name in ('invitations', 'messages') if date_bounds.get(name)]
     
-    if all_dates:
-        min_date = min(all_dates).date()
-        max_date = max(all_dates).date()
+    if bounds:
+        min_date = min(lo for lo, _ in bounds).date()
+        max_date = max(hi for _, hi in bounds).date()
         
         # Date range selector
         date_range = st.sidebar.date_input(
@@ -104,39 +200,25 @@ def main():
         if isinstance(date_range, tuple) and len(date_range) == 2:
             start_date, end_date = date_range
             
-            # Filter invitations
-            data['invitations'] = data['invitations'][
-                (data['invitations']['sent_at'].dt.date >= start_date) &
-                (data['invitations']['sent_at'].dt.date <= end_date)
-            ]
-            
-            # Filter connections
-            if len(data['connections']) > 0 and 'connected_on' in data['connections'].columns:
-                data['connections'] = data['connections'][
-                    (data['connections']['connected_on'].dt.date >= start_date) &
-                    (data['connections']['connected_on'].dt.date <= end_date)
-                ]
-            
-            # Filter messages
-            data['messages'] = data['messages'][
-                (data['messages']['date'].dt.date >= start_date) &
-                (data['messages']['date'].dt.date <= end_date)
-            ]
-            
             # Show filter info
             st.sidebar.success(f"Showing data from {start_date} to {end_date}")
             st.sidebar.metric("Days in Range", (end_date - start_date).days + 1)
         else:
             st.sidebar.warning("Please select both start and end dates")
     
+    # Every aggregate on the page, computed once per date range
+    summary = build_summary(start_date, end_date)
+    direction_counts = summary.direction_counts or {}
+    
     # Header
-    st.markdown("<h1 style='color: #0A66C2;'>Network Insights</h1>", unsafe_allow_html=True)
-    st.markdown("<p style='font-size: 1.1rem; color: #666;'>Understanding connection patterns and relationship dynamics</p>", unsafe_allow_html=True)
+    st.markdown("""
+    <h1 style='color: #0A66C2;'>Network Insights</h1>
+    <p style='font-size: 1.1rem; color: #666;'>Understanding connection patterns and relationship dynamics</p>
+    """, unsafe_allow_html=True)
     
     # ===== NETWORK COMPOSITION =====
-    st.markdown("<div class='section-header'>Network Overview</div>", unsafe_allow_html=True)
-    
     st.markdown("""
+    <div class='section-header'>Network Overview</div>
     <div class='story-text'>
     A professional network isn't just about size—it's about <span class='highlight'>strategic diversity</span> 
     and <span class='highlight'>relationship quality</span>. Let's analyze who you're connected with and why it matters.
@@ -148,13 +230,13 @@ def main():
     with col1:
         st.markdown(f"""
         <div class='stat-box'>
-            <div class='stat-number'>{format_number(len(data['invitations']))}</div>
+            <div class='stat-number'>{format_number(summary.total_invitations)}</div>
             <div class='stat-label'>TOTAL INVITATIONS</div>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
-        outgoing = len(data['invitations'][data['invitations']['direction'] == 'OUTGOING']) if 'direction' in data['invitations'].columns else 0
+        outgoing = direction_counts.get('OUTGOING', 0)
         st.markdown(f"""
         <div class='stat-box'>
             <div class='stat-number'>{format_number(outgoing)}</div>
@@ -163,7 +245,7 @@ def main():
         """, unsafe_allow_html=True)
     
     with col3:
-        incoming = len(data['invitations'][data['invitations']['direction'] == 'INCOMING']) if 'direction' in data['invitations'].columns else 0
+        incoming = direction_counts.get('INCOMING', 0)
         st.markdown(f"""
         <div class='stat-box'>
             <div class='stat-number'>{format_number(incoming)}</div>
@@ -172,183 +254,138 @@ def main():
         """, unsafe_allow_html=True)
     
     # ===== INVITATION DIRECTION BREAKDOWN =====
-    if 'direction' in data['invitations'].columns:
-        st.markdown("<div class='section-header'>Outreach vs Inbound</div>", unsafe_allow_html=True)
-        
+    if summary.direction_counts is not None:
         st.markdown("""
+        <div class='section-header'>Outreach vs Inbound</div>
         <div class='story-text'>
         The ratio of outgoing to incoming requests reveals networking strategy. 
         High outbound = proactive networking. High inbound = strong personal brand.
         </div>
         """, unsafe_allow_html=True)
         
-        direction_counts = data['invitations']['direction'].value_counts()
-        
-        fig_direction = go.Figure(data=[go.Pie(
-            labels=['Outgoing (You Initiated)', 'Incoming (They Reached Out)'],
-            values=[direction_counts.get('OUTGOING', 0), direction_counts.get('INCOMING', 0)],
-            marker=dict(colors=['#0A66C2', '#5BA7F5']),
-            hole=0.4,
-            textinfo='label+percent+value',
-            textfont=dict(size=14)
-        )])
-        
-        fig_direction.update_layout(
-            height=400,
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5),
-            margin=dict(l=20, r=20, t=20, b=60),
-            paper_bgcolor='rgba(0,0,0,0)'
-        )
-        
-        st.plotly_chart(fig_direction, use_container_width=True)
-        
-        # Insight
-        outbound_pct = (outgoing / len(data['invitations']) * 100) if len(data['invitations']) > 0 else 0
-        
-        if outbound_pct > 70:
-            insight = "<strong>Proactive Networker:</strong> You're taking initiative and actively building connections."
-        elif outbound_pct > 40:
-            insight = "<strong>Balanced Approach:</strong> You have a healthy mix of outreach and inbound interest."
+        # Nothing to chart for an empty range - skip building the figure
+        if summary.total_invitations == 0:
+            st.info("No invitations in the selected date range.")
         else:
-            insight = "<strong>Strong Brand:</strong> Your profile attracts significant inbound connection requests."
-        
-        st.markdown(f"""
-        <div style='background: #F3F6F8; padding: 1.5rem; border-radius: 8px; border-left: 4px solid #0A66C2;'>
-        {insight}
-        </div>
-        """, unsafe_allow_html=True)
+            fig_direction = pio.from_json(_direction_figure_json(outgoing, incoming))
+            
+            st.plotly_chart(fig_direction, use_container_width=True)
+            
+            # Insight
+            outbound_pct = outgoing / summary.total_invitations * 100
+            
+            if outbound_pct > 70:
+                insight = "<strong>Proactive Networker:</strong> You're taking initiative and actively building connections."
+            elif outbound_pct > 40:
+                insight = "<strong>Balanced Approach:</strong> You have a healthy mix of outreach and inbound interest."
+            else:
+                insight = "<strong>Strong Brand:</strong> Your profile attracts significant inbound connection requests."
+            
+            st.markdown(f"""
+            <div style='background: #F3F6F8; padding: 1.5rem; border-radius: 8px; border-left: 4px solid #0A66C2;'>
+            {insight}
+            </div>
+            """, unsafe_allow_html=True)
     
     # ===== MESSAGING PATTERNS =====
-    st.markdown("<div class='section-header'>Communication Patterns</div>", unsafe_allow_html=True)
-    
     st.markdown("""
+    <div class='section-header'>Communication Patterns</div>
     <div class='story-text'>
     Connection is just the first step. Real relationships are built through <span class='highlight'>consistent communication</span>.
     </div>
     """, unsafe_allow_html=True)
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Messages over time
-        if len(data['messages']) > 0:
-            messages_by_month = data['messages'].groupby(data['messages']['date'].dt.to_period('M')).size()
+    if summary.total_messages == 0:
+        st.info("No messages in the selected date range.")
+    else:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Messages over time
+            messages_by_month = summary.monthly_messages
             
-            fig_messages = go.Figure()
-            fig_messages.add_trace(go.Scatter(
-                x=[str(p) for p in messages_by_month.index],
-                y=messages_by_month.values,
-                mode='lines+markers',
-                line=dict(color='#0A66C2', width=3),
-                marker=dict(size=8),
-                fill='tozeroy',
-                fillcolor='rgba(10, 102, 194, 0.1)'
+            fig_messages = pio.from_json(_messages_figure_json(
+                tuple(messages_by_month.index.strftime('%Y-%m')), tuple(messages_by_month.values)
             ))
             
-            fig_messages.update_layout(
-                title='Message Activity Over Time',
-                xaxis_title='Month',
-                yaxis_title='Messages',
-                height=350,
-                margin=dict(l=20, r=20, t=40, b=60),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(tickangle=-45)
-            )
-            
             st.plotly_chart(fig_messages, use_container_width=True)
-    
-    with col2:
-        # Top conversations
-        if len(data['messages']) > 0:
-            # Get top conversation partners
-            user_name = "Rohan Shrestha"
-            
-            # Count messages per person (both from and to)
-            from_counts = data['messages']['from'].value_counts()
-            to_counts = data['messages']['to'].value_counts()
-            
-            # Combine and exclude self
-            all_names = list(from_counts.index) + list(to_counts.index)
-            name_counts = Counter(all_names)
-            
-            # Remove self
-            if user_name in name_counts:
-                del name_counts[user_name]
-            
-            # Get top 10
-            top_10 = dict(name_counts.most_common(10))
-            
-            fig_top = go.Figure(go.Bar(
-                x=list(top_10.values()),
-                y=list(top_10.keys()),
-                orientation='h',
-                marker=dict(color='#0A66C2')
-            ))
+        
+        with col2:
+            # Top conversations
+            top_10 = summary.top_partners
             
-            fig_top.update_layout(
-                title='Top 10 Most Active Conversations',
-                xaxis_title='Message Count',
-                height=350,
-                margin=dict(l=20, r=20, t=40, b=20),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
+            # Ten bars don't need Plotly - a native Vega-Lite chart ships a small Arrow table
+            st.vega_lite_chart(
+                top_10.rename_axis('Person').rename('Message Count').reset_index(),
+                {
+                    'title': 'Top 10 Most Active Conversations',
+                    'height': 350,
+                    'mark': {'type': 'bar', 'color': '#0A66C2'},
+                    'encoding': {
+                        'x': {'field': 'Message Count', 'type': 'quantitative'},
+                        'y': {'field': 'Person', 'type': 'nominal', 'sort': '-x', 'title': None}
+                    }
+                },
+                use_container_width=True
             )
-            
-            st.plotly_chart(fig_top, use_container_width=True)
     
     # ===== ENGAGEMENT QUALITY =====
-    st.markdown("<div class='section-header'>Engagement Quality</div>", unsafe_allow_html=True)
-    
     st.markdown("""
+    <div class='section-header'>Engagement Quality</div>
     <div class='story-text'>
     Not all conversations are equal. High-quality engagement includes <span class='highlight'>referrals</span>, 
     <span class='highlight'>interview opportunities</span>, and <span class='highlight'>positive outcomes</span>.
     </div>
     """, unsafe_allow_html=True)
     
-    if all(col in data['messages'].columns for col in ['has_referral_keyword', 'has_interview_keyword', 'has_positive_keyword']):
+    if summary.total_messages == 0:
+        st.info("No messages in the selected date range.")
+    elif summary.keyword_sums.keys() >= QUALITY_COLUMN_SET:
+        
+        referrals, interviews, positive = (summary.keyword_sums[col] for col in QUALITY_COLUMNS)
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            referrals = data['messages']['has_referral_keyword'].sum()
             st.metric("Referral Mentions", format_number(referrals))
         
         with col2:
-            interviews = data['messages']['has_interview_keyword'].sum()
             st.metric("Interview Keywords", format_number(interviews))
         
         with col3:
-            positive = data['messages']['has_positive_keyword'].sum()
             st.metric("Positive Sentiment", format_number(positive))
         
         with col4:
-            engagement_rate = ((referrals + interviews) / len(data['messages']) * 100) if len(data['messages']) > 0 else 0
+            engagement_rate = ((referrals + interviews) / summary.total_messages * 100) if summary.total_messages > 0 else 0
             st.metric("Quality Rate", f"{engagement_rate:.1f}%")
         
         # Outcome breakdown
-        outcome_data = {
+        outcome_data = pd.DataFrame({
             'Category': ['Referrals', 'Interviews', 'Positive Responses'],
             'Count': [referrals, interviews, positive]
-        }
+        })
         
-        fig_outcomes = go.Figure(data=[go.Bar(
-            x=outcome_data['Category'],
-            y=outcome_data['Count'],
-            marker=dict(color=['#057642', '#0A66C2', '#5BA7F5'])
-        )])
-        
-        fig_outcomes.update_layout(
-            title='Outcome Distribution',
-            height=350,
-            margin=dict(l=20, r=20, t=40, b=20),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
+        st.vega_lite_chart(
+            outcome_data,
+            {
+                'title': 'Outcome Distribution',
+                'height': 350,
+                'mark': 'bar',
+                'encoding': {
+                    'x': {'field': 'Category', 'type': 'nominal', 'sort': None, 'title': None},
+                    'y': {'field': 'Count', 'type': 'quantitative', 'title': None},
+                    'color': {
+                        'field': 'Category',
+                        'scale': {
+                            'domain': list(outcome_data['Category']),
+                            'range': ['#057642', '#0A66C2', '#5BA7F5']
+                        },
+                        'legend': None
+                    }
+                }
+            },
+            use_container_width=True
         )
-        
-        st.plotly_chart(fig_outcomes, use_container_width=True)
     
     # ===== KEY TAKEAWAYS =====
     st.markdown("<div class='section-header'>Key Takeaways</div>", unsafe_allow_html=True)
@@ -5,6 +5,7 @@ Message Analysis Page - Response patterns and conversation effectiveness
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
 import plotly.express as px
 import sys
 from pathlib import Path
@@ -15,7 +16,7 @@ from data_loader import DataLoader, MetricsCalculator, format_number, format_per
 st.set_page_config(page_title="Message Analysis", page_icon="📈", layout="wide")
 
 # Apply CSS
-st.markdown("""
+_CSS = """
 <style>
     #MainMenu {visibility: hidden;}
     footer {visibility: hidden;}
@@ -50,92 +51,143 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_CSS, unsafe_allow_html=True)
 
-@st.cache_data
-def load_all_data():
-    loader = DataLoader()
+# The loader and its datasets are cached with cache_resource (as in app.py) so
+# reruns get the same objects back instead of unpickled copies. The frames are
+# shared across sessions and must not be mutated in place.
+@st.cache_resource(show_spinner=False)
+def _get_loader():
+    return DataLoader()
+
+@st.cache_resource(show_spinner="Loading messages...")
+def _load_datasets():
+    loader = _get_loader()
     return {
         'invitations': loader.load_invitations(),
         'connections': loader.load_connections(),
         'messages': loader.load_messages()
     }
 
-def main():
+def load_all_data():
+    """Load all datasets with caching (a new dict; the frames are shared)"""
+    return dict(_load_datasets())
+
+@st.cache_data(show_spinner=False)
+def filter_by_date(start_date, end_date):
+    """Load all datasets limited to start_date..end_date, cached per date range"""
     data = load_all_data()
-    calc = MetricsCalculator()
     
-    # ===== DATE FILTER IN SIDEBAR =====
-    st.sidebar.title("Filters")
+    # Whole days start_date..end_date, compared in datetime64 space
+    start_ts = pd.Timestamp(start_date)
+    end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)
     
-    # Get min and max dates from all datasets
-    all_dates = []
-    if len(data['invitations']) > 0:
-        all_dates.extend(data['invitations']['sent_at'].dropna().tolist())
-    if len(data['messages']) > 0:
-        all_dates.extend(data['messages']['date'].dropna().tolist())
-    
-    if all_dates:
-        min_date = min(all_dates).date()
-        max_date = max(all_dates).date()
-        
-        # Date range selector
-        date_range = st.sidebar.date_input(
-            "Select Date Range",
-            value=(min_date, max_date),
-            min_value=min_date,
-            max_value=max_date,
-            help="Filter all data by date range"
-        )
-        
-        # Apply date filter
-        if isinstance(date_range, tuple) and len(date_range) == 2:
-            start_date, end_date = date_range
-            
-            # Filter invitations
-            data['invitations'] = data['invitations'][
-                (data['invitations']['sent_at'].dt.date >= start_date) &
-                (data['invitations']['sent_at'].dt.date <= end_date)
-            ]
-            
-            # Filter connections
-            if len(data['connections']) > 0 and 'connected_on' in data['connections'].columns:
-                data['connections'] = data['connections'][
-                    (data['connections']['connected_on'].dt.date >= start_date) &
-                    (data['connections']['connected_on'].dt.date <= end_date)
-                ]
-            
-            # Filter messages
-            data['messages'] = data['messages'][
-                (data['messages']['date'].dt.date >= start_date) &
-                (data['messages']['date'].dt.date <= end_date)
-            ]
-            
-            # Show filter info
-            st.sidebar.success(f"Showing data from {start_date} to {end_date}")
-            st.sidebar.metric("Days in Range", (end_date - start_date).days + 1)
-        else:
-            st.sidebar.warning("Please select both start and end dates")
+    # Filter invitations
+    data['invitations'] = data['invitations'][
+        data['invitations']['sent_at'].between(start_ts, end_ts, inclusive='left')
+    ]
     
-    # Header
-    st.markdown("<h1 style='color: #0A66C2;'>Message Analysis</h1>", unsafe_allow_html=True)
-    st.markdown("<p style='font-size: 1.1rem; color: #666;'>Deep dive into conversation patterns and response effectiveness</p>", unsafe_allow_html=True)
+    # Filter connections
+    if len(data['connections']) > 0 and 'connected_on' in data['connections'].columns:
+        data['connections'] = data['connections'][
+            data['connections']['connected_on'].between(start_ts, end_ts, inclusive='left')
+        ]
     
-    # ===== THE CHALLENGE =====
-    st.markdown("<div class='section-header'>The Challenge</div>", unsafe_allow_html=True)
+    # Filter messages
+    data['messages'] = data['messages'][
+        data['messages']['date'].between(start_ts, end_ts, inclusive='left')
+    ]
     
-    st.markdown("""
-    <div class='story-text'>
-    Getting someone to accept your connection is one thing. Getting them to <span class='highlight'>respond</span> 
-    and <span class='highlight'>engage</span> is entirely different. This analysis reveals what separates 
-    successful conversations from dead ends.
+    return data
+
+def _load_filtered(start_date, end_date):
+    """All datasets, limited to the date range when one is selected"""
+    return load_all_data() if start_date is None else filter_by_date(start_date, end_date)
+
+@st.cache_data(show_spinner=False)
+def conversation_pairs(start_date=None, end_date=None):
+    """Message count per from/to pair in the date range, cached per range"""
+    messages = _load_filtered(start_date, end_date)['messages']
+    # Unsorted groups - callers only aggregate over the counts
+    return messages.groupby(['from', 'to'], sort=False, observed=True).size().reset_index(name='message_count')
+
+@st.cache_data(show_spinner=False)
+def timing_counts(start_date=None, end_date=None):
+    """Messages per weekday (Monday..Sunday) and per hour of day in the date range, cached per range"""
+    messages = _load_filtered(start_date, end_date)['messages']
+    # day_of_week is an ordered Monday..Sunday categorical: counts come back in
+    # that order, with zero for days that have no messages
+    day_counts = messages['day_of_week'].value_counts(sort=False)
+    hour_counts = messages['hour'].value_counts().sort_index()
+    return day_counts, hour_counts
+
+@st.cache_data(show_spinner=False)
+def _days_figure_json(days, counts):
+    fig_days = go.Figure(data=[go.Bar(
+        x=list(days),
+        y=list(counts),
+        marker=dict(
+            color=list(counts),
+            colorscale='Blues',
+            showscale=False
+        )
+    )])
+    
+    fig_days.update_layout(
+        title='Message Activity by Day of Week',
+        xaxis_title='Day',
+        yaxis_title='Message Count',
+        height=350,
+        margin=dict(l=20, r=20, t=40, b=60),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(tickangle=-45)
+    )
+    
+    return fig_days.to_json()
+
+@st.cache_data(show_spinner=False)
+def _depth_figure_json(depths, counts):
+    fig_depth = go.Figure(data=[go.Bar(
+        x=[f"{i} msg" + ("s" if i > 1 else "") for i in depths],
+        y=list(counts),
+        marker=dict(color='#0A66C2')
+    )])
+    
+    fig_depth.update_layout(
+        title='Conversation Depth Distribution',
+        xaxis_title='Messages in Conversation',
+        yaxis_title='Number of Conversations',
+        height=400,
+        margin=dict(l=20, r=20, t=40, b=60),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(tickangle=-45)
+    )
+    
+    return fig_depth.to_json()
+
+def _share(count, total):
+    """count as a percentage of total (0 when total is 0)"""
+    return count / total * 100 if total > 0 else 0
+
+def _outcome_card(value, label, color, rate):
+    """Render one outcome card: the count, its label and its share of all messages"""
+    st.markdown(f"""
+    <div style='background: #F3F6F8; padding: 2rem; border-radius: 12px; text-align: center;'>
+    <div style='font-size: 2.5rem; font-weight: 700; color: {color};'>{value}</div>
+    <div style='font-size: 1rem; margin-top: 0.5rem;'>{label}</div>
+    <div style='font-size: 0.9rem; color: #666; margin-top: 0.5rem;'>{rate:.1f}% of messages</div>
     </div>
     """, unsafe_allow_html=True)
-    
+
+# Each section is a fragment: interactions inside a section rerun only that
+# section, and the date filter (a full rerun) refreshes all of them from the
+# cached per-range helpers.
+@st.fragment
+def render_response(response_metrics):
     # ===== RESPONSE METRICS =====
-    user_name = "Rohan Shrestha"
-    response_metrics = calc.calculate_response_metrics(data['messages'], user_name)
-    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
@@ -166,7 +218,9 @@ def main():
             format_number(response_metrics['total_messages']),
             help="Total messages in the dataset (sent + received)"
         )
-    
+
+@st.fragment
+def render_timing(messages, start_date, end_date):
     # ===== TIMING ANALYSIS =====
     st.markdown("<div class='section-header'>When Do People Respond?</div>", unsafe_allow_html=True)
     
@@ -177,39 +231,15 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    if len(data['messages']) > 0:
-        # Message activity by day of week
-        data['messages']['day_of_week'] = data['messages']['date'].dt.day_name()
-        data['messages']['hour'] = data['messages']['date'].dt.hour
+    if len(messages) > 0:
+        # Message activity by day of week and hour, shared by the chart and insights
+        day_counts, hour_counts = timing_counts(start_date, end_date)
         
         col1, col2 = st.columns(2)
         
         with col1:
             # Day of week analysis
-            day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            day_counts = data['messages']['day_of_week'].value_counts()
-            day_counts = day_counts.reindex(day_order, fill_value=0)
-            
-            fig_days = go.Figure(data=[go.Bar(
-                x=day_counts.index,
-                y=day_counts.values,
-                marker=dict(
-                    color=day_counts.values,
-                    colorscale='Blues',
-                    showscale=False
-                )
-            )])
-            
-            fig_days.update_layout(
-                title='Message Activity by Day of Week',
-                xaxis_title='Day',
-                yaxis_title='Message Count',
-                height=350,
-                margin=dict(l=20, r=20, t=40, b=60),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(tickangle=-45)
-            )
+            fig_days = pio.from_json(_days_figure_json(tuple(day_counts.index), tuple(day_counts.tolist())))
             
             st.plotly_chart(fig_days, use_container_width=True)
         
@@ -218,10 +248,10 @@ def main():
             outcome_data = {
                 'Outcome Type': ['Referrals', 'Interviews', 'Positive Sentiment', 'Negative Sentiment'],
                 'Count': [
-                    data['messages']['has_referral_keyword'].sum() if 'has_referral_keyword' in data['messages'].columns else 0,
-                    data['messages']['has_interview_keyword'].sum() if 'has_interview_keyword' in data['messages'].columns else 0,
-                    data['messages']['has_positive_keyword'].sum() if 'has_positive_keyword' in data['messages'].columns else 0,
-                    data['messages']['has_negative_keyword'].sum() if 'has_negative_keyword' in data['messages'].columns else 0
+                    messages['has_referral_keyword'].sum() if 'has_referral_keyword' in messages.columns else 0,
+                    messages['has_interview_keyword'].sum() if 'has_interview_keyword' in messages.columns else 0,
+                    messages['has_positive_keyword'].sum() if 'has_positive_keyword' in messages.columns else 0,
+                    messages['has_negative_keyword'].sum() if 'has_negative_keyword' in messages.columns else 0
                 ],
                 'Color': ['#057642', '#0A66C2', '#4CAF50', '#FF6B6B']
             }
@@ -249,17 +279,21 @@ def main():
         
         # Timing insights
         peak_day = day_counts.idxmax()
+        peak_hour = f"{int(hour_counts.idxmax()):02d}:00" if len(hour_counts) > 0 else "n/a"
         total_outcomes = sum(outcome_data['Count'])
         
         st.markdown(f"""
         <div class='insight-card'>
         <h4 style='color: #0A66C2; margin-top: 0;'>Key Insights</h4>
         <p><strong>Peak Day:</strong> {peak_day} sees the highest message activity.</p>
+        <p><strong>Peak Hour:</strong> {peak_hour} is the busiest hour of the day.</p>
         <p><strong>Total Positive Signals:</strong> {total_outcomes} outcome indicators detected in conversations.</p>
         <p><em>Focus on building relationships that show referral and interview signals.</em></p>
         </div>
         """, unsafe_allow_html=True)
-    
+
+@st.fragment
+def render_depth(messages, start_date, end_date):
     # ===== CONVERSATION DEPTH =====
     st.markdown("<div class='section-header'>Conversation Quality</div>", unsafe_allow_html=True)
     
@@ -271,39 +305,26 @@ def main():
     """, unsafe_allow_html=True)
     
     # Calculate conversation depth (messages per unique person)
-    if len(data['messages']) > 0:
+    if len(messages) > 0:
         # Count messages per unique from-to pair
-        conversation_pairs = data['messages'].groupby(['from', 'to']).size().reset_index(name='message_count')
+        pairs = conversation_pairs(start_date, end_date)
         
-        # Distribution of conversation lengths
-        depth_distribution = conversation_pairs['message_count'].value_counts().sort_index()
+        # Distribution of conversation lengths - the 20 most common, in length order
+        depth_distribution = pairs['message_count'].value_counts().nlargest(20).sort_index()
         
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            fig_depth = go.Figure(data=[go.Bar(
-                x=[f"{i} msg" + ("s" if i > 1 else "") for i in depth_distribution.index[:20]],
-                y=depth_distribution.values[:20],
-                marker=dict(color='#0A66C2')
-            )])
-            
-            fig_depth.update_layout(
-                title='Conversation Depth Distribution',
-                xaxis_title='Messages in Conversation',
-                yaxis_title='Number of Conversations',
-                height=400,
-                margin=dict(l=20, r=20, t=40, b=60),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(tickangle=-45)
-            )
+            fig_depth = pio.from_json(_depth_figure_json(
+                tuple(depth_distribution.index.tolist()), tuple(depth_distribution.tolist())
+            ))
             
             st.plotly_chart(fig_depth, use_container_width=True)
         
         with col2:
-            avg_depth = conversation_pairs['message_count'].mean()
-            median_depth = conversation_pairs['message_count'].median()
-            max_depth = conversation_pairs['message_count'].max()
+            avg_depth = pairs['message_count'].mean()
+            median_depth = pairs['message_count'].median()
+            max_depth = pairs['message_count'].max()
             
             st.markdown(f"""
             <div style='background: linear-gradient(135deg, #0A66C2 0%, #004182 100%); padding: 2rem; border-radius: 12px; color: white; margin-top: 2rem;'>
@@ -322,7 +343,9 @@ def main():
             </div>
             </div>
             """, unsafe_allow_html=True)
-    
+
+@st.fragment
+def render_outcomes(engagement_metrics, n_msgs):
     # ===== OUTCOME SIGNALS =====
     st.markdown("<div class='section-header'>Outcome Analysis</div>", unsafe_allow_html=True)
     
@@ -333,39 +356,99 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    engagement_metrics = calc.calculate_engagement_metrics(data['messages'])
+    outcome_cards = [
+        ('has_referrals', 'Referral Mentions', '#057642'),
+        ('has_interviews', 'Interview Keywords', '#0A66C2'),
+        ('positive_sentiment', 'Positive Responses', '#5BA7F5')
+    ]
     
-    col1, col2, col3 = st.columns(3)
+    for col, (key, label, color) in zip(st.columns(3), outcome_cards):
+        with col:
+            count = engagement_metrics[key]
+            _outcome_card(count, label, color, _share(count, n_msgs))
+
+@st.fragment
+def render_bottom_line(engagement_metrics, n_msgs):
+    # ===== BOTTOM LINE =====
+    st.markdown("<br>", unsafe_allow_html=True)
     
-    with col1:
-        referral_rate = (engagement_metrics['has_referrals'] / len(data['messages']) * 100) if len(data['messages']) > 0 else 0
-        st.markdown(f"""
-        <div style='background: #F3F6F8; padding: 2rem; border-radius: 12px; text-align: center;'>
-        <div style='font-size: 2.5rem; font-weight: 700; color: #057642;'>{engagement_metrics['has_referrals']}</div>
-        <div style='font-size: 1rem; margin-top: 0.5rem;'>Referral Mentions</div>
-        <div style='font-size: 0.9rem; color: #666; margin-top: 0.5rem;'>{referral_rate:.1f}% of messages</div>
-        </div>
-        """, unsafe_allow_html=True)
+    total_outcomes = engagement_metrics['has_referrals'] + engagement_metrics['has_interviews']
+    outcome_percentage = _share(total_outcomes, n_msgs)
     
-    with col2:
-        interview_rate = (engagement_metrics['has_interviews'] / len(data['messages']) * 100) if len(data['messages']) > 0 else 0
-        st.markdown(f"""
-        <div style='background: #F3F6F8; padding: 2rem; border-radius: 12px; text-align: center;'>
-        <div style='font-size: 2.5rem; font-weight: 700; color: #0A66C2;'>{engagement_metrics['has_interviews']}</div>
-        <div style='font-size: 1rem; margin-top: 0.5rem;'>Interview Keywords</div>
-        <div style='font-size: 0.9rem; color: #666; margin-top: 0.5rem;'>{interview_rate:.1f}% of messages</div>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #057642 0%, #045c35 100%); padding: 2rem; border-radius: 12px; color: white; text-align: center;'>
+    <h2 style='margin-top: 0;'>The Bottom Line</h2>
+    <p style='font-size: 1.2rem; margin: 1.5rem 0;'>
+    Out of every <strong>100 messages</strong> sent, approximately <strong>{int(outcome_percentage)}</strong> 
+    result in tangible professional opportunities (referrals or interviews).
+    </p>
+    <p style='font-size: 1rem; opacity: 0.9;'>
+    This is {outcome_percentage/10:.1f}x better than passive networking approaches.
+    </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+def main():
+    # Header - static, so it renders before the (possibly cold) data load
+    st.markdown("<h1 style='color: #0A66C2;'>Message Analysis</h1>", unsafe_allow_html=True)
+    st.markdown("<p style='font-size: 1.1rem; color: #666;'>Deep dive into conversation patterns and response effectiveness</p>", unsafe_allow_html=True)
     
-    with col3:
-        positive_rate = (engagement_metrics['positive_sentiment'] / len(data['messages']) * 100) if len(data['messages']) > 0 else 0
-        st.markdown(f"""
-        <div style='background: #F3F6F8; padding: 2rem; border-radius: 12px; text-align: center;'>
-        <div style='font-size: 2.5rem; font-weight: 700; color: #5BA7F5;'>{engagement_metrics['positive_sentiment']}</div>
-        <div style='font-size: 1rem; margin-top: 0.5rem;'>Positive Responses</div>
-        <div style='font-size: 0.9rem; color: #666; margin-top: 0.5rem;'>{positive_rate:.1f}% of messages</div>
-        </div>
-        """, unsafe_allow_html=True)
+    # ===== THE CHALLENGE =====
+    st.markdown("<div class='section-header'>The Challenge</div>", unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class='story-text'>
+    Getting someone to accept your connection is one thing. Getting them to <span class='highlight'>respond</span> 
+    and <span class='highlight'>engage</span> is entirely different. This analysis reveals what separates 
+    successful conversations from dead ends.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    data = load_all_data()
+    calc = MetricsCalculator()
+    start_date = end_date = None
+    
+    # ===== DATE FILTER IN SIDEBAR =====
+    st.sidebar.title("Filters")
+    
+    # Get min and max dates from the bounds recorded at load time
+    date_bounds = _get_loader().date_bounds
+    bounds = [date_bounds[name] for name in ('invitations', 'messages') if date_bounds.get(name)]
+    
+    if bounds:
+        min_date = min(lo for lo, _ in bounds).date()
+        max_date = max(hi for _, hi in bounds).date()
+        
+        # Date range selector
+        date_range = st.sidebar.date_input(
+            "Select Date Range",
+            value=(min_date, max_date),
+            min_value=min_date,
+            max_value=max_date,
+            help="Filter all data by date range"
+        )
+        
+        # Apply date filter
+        if isinstance(date_range, tuple) and len(date_range) == 2:
+            start_date, end_date = date_range
+            data = filter_by_date(start_date, end_date)
+            
+            # Show filter info
+            st.sidebar.success(f"Showing data from {start_date} to {end_date}")
+            st.sidebar.metric("Days in Range", (end_date - start_date).days + 1)
+        else:
+            st.sidebar.warning("Please select both start and end dates")
+    
+    # Metrics shared by the sections below
+    user_name = "Rohan Shrestha"
+    response_metrics = calc.calculate_response_metrics(data['messages'], user_name)
+    engagement_metrics = calc.calculate_engagement_metrics(data['messages'])
+    n_msgs = len(data['messages'])
+    
+    render_response(response_metrics)
+    render_timing(data['messages'], start_date, end_date)
+    render_depth(data['messages'], start_date, end_date)
+    render_outcomes(engagement_metrics, n_msgs)
     
     # ===== KEY INSIGHTS =====
     st.markdown("<div class='section-header'>Strategic Insights</div>", unsafe_allow_html=True)
@@ -396,24 +479,7 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     
-    # ===== BOTTOM LINE =====
-    st.markdown("<br>", unsafe_allow_html=True)
-    
-    total_outcomes = engagement_metrics['has_referrals'] + engagement_metrics['has_interviews']
-    outcome_percentage = (total_outcomes / len(data['messages']) * 100) if len(data['messages']) > 0 else 0
-    
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #057642 0%, #045c35 100%); padding: 2rem; border-radius: 12px; color: white; text-align: center;'>
-    <h2 style='margin-top: 0;'>The Bottom Line</h2>
-    <p style='font-size: 1.2rem; margin: 1.5rem 0;'>
-    Out of every <strong>100 messages</strong> sent, approximately <strong>{int(outcome_percentage)}</strong> 
-    result in tangible professional opportunities (referrals or interviews).
-    </p>
-    <p style='font-size: 1rem; opacity: 0.9;'>
-    This is {outcome_percentage/10:.1f}x better than passive networking approaches.
-    </p>
-    </div>
-    """, unsafe_allow_html=True)
+    render_bottom_line(engagement_metrics, n_msgs)
 
 if __name__ == "__main__":
     main()
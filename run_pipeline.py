@@ -5,17 +5,21 @@ This script orchestrates the complete data cleaning and standardization process
 for all LinkedIn export datasets.
 
 Usage:
-    python run_pipeline.py [--skip-missing]
+    python run_pipeline.py [--skip-missing] [--chunksize N] [--incremental]
 
 Options:
     --skip-missing    Continue processing even if some files are missing
+    --chunksize N     Clean each file N rows at a time (lower peak memory)
+    --incremental     Skip datasets whose cleaned output is newer than the raw file
 """
 
 import sys
 import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import json
+import orjson
+import pyarrow as pa
 
 # Add src to path
 sys.path.append(os.path.dirname(__file__))
@@ -29,11 +33,29 @@ from src.clean_learning_messages import clean_learning_messages
 from src.clean_comments import clean_comments
 
 
+def init_worker(arrow_threads):
+    """Limit each worker's PyArrow thread pool so parallel workers don't oversubscribe the CPUs"""
+    pa.set_cpu_count(arrow_threads)
+    pa.set_io_thread_count(arrow_threads)
+
+
+def clean_dataset(function, input_file, output_file, chunksize=None):
+    """Run one cleaning function (in a worker process) and return the cleaned shape"""
+    if chunksize:
+        # Chunked cleaning writes as it goes and returns the shape itself
+        return function(input_file=input_file, output_file=output_file, chunksize=chunksize)
+    
+    df_cleaned = function(input_file=input_file, output_file=output_file)
+    return df_cleaned.shape
+
+
 class ETLPipeline:
     """Master ETL Pipeline for LinkedIn Networking Data"""
     
-    def __init__(self, skip_missing=False):
+    def __init__(self, skip_missing=False, chunksize=None, incremental=False):
         self.skip_missing = skip_missing
+        self.chunksize = chunksize
+        self.incremental = incremental
         self.results = {
             'start_time': datetime.now().isoformat(),
             'datasets_processed': [],
@@ -98,10 +120,17 @@ class ETLPipeline:
         existing_files = []
         missing_files = []
         
+        # One directory listing instead of an exists + getsize call per dataset
+        try:
+            with os.scandir(raw_dir) as it:
+                raw_files = {entry.name: entry for entry in it if entry.is_file()}
+        except FileNotFoundError:
+            raw_files = {}
+        
         for dataset in self.datasets:
-            filepath = os.path.join(raw_dir, dataset['input_file'])
-            if os.path.exists(filepath):
-                file_size = os.path.getsize(filepath) / 1024  # KB
+            entry = raw_files.get(dataset['input_file'])
+            if entry is not None:
+                file_size = entry.stat().st_size / 1024  # KB
                 logger.info(f"✓ Found: {dataset['input_file']} ({file_size:.2f} KB)")
                 existing_files.append(dataset['name'])
             else:
@@ -118,53 +147,104 @@ class ETLPipeline:
         
         return True
     
-    def run_dataset_cleaning(self, dataset):
-        """Run cleaning for a single dataset"""
+    def is_up_to_date(self, dataset):
+        """Whether the cleaned output is at least as new as its raw file (incremental runs only)"""
         
-        logger.info("=" * 80)
-        logger.info(f"PROCESSING: {dataset['name']}")
-        logger.info(f"Description: {dataset['description']}")
-        logger.info("=" * 80)
+        if not self.incremental:
+            return False
         
-        try:
-            # Check if file exists
+        # Outputs are moved into place only once fully written (save_cleaned_data,
+        # save_cleaned_chunks), so a crashed run can't leave a partial file that
+        # looks current here
+        raw_path = os.path.join('data/raw', dataset['input_file'])
+        cleaned_path = os.path.join('data/cleaned', dataset['output_file'])
+        return (
+            os.path.exists(cleaned_path)
+            and os.path.getmtime(cleaned_path) >= os.path.getmtime(raw_path)
+        )
+    
+    def run_all_datasets(self):
+        """Run cleaning for every dataset in parallel, one worker process per dataset
+        
+        The datasets are independent, so each cleaning function runs in its own
+        process. Results are still recorded in dataset order.
+        """
+        
+        pending = []
+        for dataset in self.datasets:
             raw_path = os.path.join('data/raw', dataset['input_file'])
-            if not os.path.exists(raw_path):
-                if self.skip_missing:
-                    logger.warning(f"Skipping {dataset['name']} - file not found")
+            if os.path.exists(raw_path):
+                if self.is_up_to_date(dataset):
+                    logger.info(f"Skipping {dataset['name']} - cleaned output is up to date")
                     self.results['datasets_skipped'].append(dataset['name'])
-                    return None
                 else:
-                    raise FileNotFoundError(f"File not found: {raw_path}")
-            
-            # Run cleaning function
-            df_cleaned = dataset['function'](
-                input_file=dataset['input_file'],
-                output_file=dataset['output_file']
-            )
-            
-            # Record success
-            self.results['datasets_processed'].append({
-                'name': dataset['name'],
-                'rows': len(df_cleaned),
-                'columns': len(df_cleaned.columns),
-                'output_file': dataset['output_file']
-            })
-            
-            logger.info(f"✓ Successfully processed {dataset['name']}")
-            return df_cleaned
-            
-        except Exception as e:
-            logger.error(f"✗ Failed to process {dataset['name']}: {str(e)}")
-            self.results['datasets_failed'].append({
-                'name': dataset['name'],
-                'error': str(e)
-            })
-            
-            if not self.skip_missing:
-                raise
+                    pending.append(dataset)
+            else:
+                # check_raw_data_exists already aborted unless skip_missing is set
+                logger.warning(f"Skipping {dataset['name']} - file not found")
+                self.results['datasets_skipped'].append(dataset['name'])
+        
+        if not pending:
+            return
+        
+        logger.info("=" * 80)
+        logger.info(f"PROCESSING {len(pending)} DATASETS IN PARALLEL")
+        for dataset in pending:
+            logger.info(f"  - {dataset['name']}: {dataset['description']}")
+        logger.info("=" * 80)
+        
+        cpu_count = os.cpu_count() or 1
+        max_workers = min(len(pending), cpu_count)
+        # Share the cores between workers: each one's CSV reader is multi-threaded too
+        arrow_threads = max(1, cpu_count // max_workers)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=init_worker,
+            initargs=(arrow_threads,)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    clean_dataset, d['function'], d['input_file'], d['output_file'], self.chunksize
+                )
+                for d in pending
+            ]
             
-            return None
+            for dataset, future in zip(pending, futures):
+                try:
+                    shape = future.result()
+                except Exception as e:
+                    self.record_failure(dataset, e)
+                    
+                    if not self.skip_missing:
+                        # Don't start datasets that haven't been picked up yet
+                        for other in futures:
+                            other.cancel()
+                        raise
+                    continue
+                
+                self.record_success(dataset, shape)
+    
+    def record_success(self, dataset, shape):
+        """Record a cleaned dataset's (rows, columns) in the results"""
+        
+        rows, columns = shape
+        self.results['datasets_processed'].append({
+            'name': dataset['name'],
+            'rows': rows,
+            'columns': columns,
+            'output_file': dataset['output_file']
+        })
+        
+        logger.info(f"✓ Successfully processed {dataset['name']}")
+    
+    def record_failure(self, dataset, error):
+        """Record a dataset whose cleaning raised"""
+        
+        logger.error(f"✗ Failed to process {dataset['name']}: {str(error)}")
+        self.results['datasets_failed'].append({
+            'name': dataset['name'],
+            'error': str(error)
+        })
     
     def run(self):
         """Execute the complete ETL pipeline"""
@@ -184,10 +264,9 @@ class ETLPipeline:
         
         logger.info("\n")
         
-        # Process each dataset
-        for dataset in self.datasets:
-            self.run_dataset_cleaning(dataset)
-            logger.info("\n")
+        # Process all datasets
+        self.run_all_datasets()
+        logger.info("\n")
         
         # Record completion
         self.results['end_time'] = datetime.now().isoformat()
@@ -234,8 +313,12 @@ class ETLPipeline:
         
         report_path = os.path.join('outputs', 'pipeline_report.json')
         
-        with open(report_path, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        # orjson also serializes numpy scalars (e.g. row counts) natively
+        with open(report_path, 'wb') as f:
+            f.write(orjson.dumps(
+                self.results,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ))
         
         logger.info(f"\nPipeline report saved to: {report_path}")
 
@@ -251,11 +334,26 @@ def main():
         action='store_true',
         help='Continue processing even if some files are missing'
     )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=None,
+        help='Clean each file this many rows at a time (lower peak memory for large exports)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Skip datasets whose cleaned output is newer than the raw file'
+    )
     
     args = parser.parse_args()
     
     # Create and run pipeline
-    pipeline = ETLPipeline(skip_missing=args.skip_missing)
+    pipeline = ETLPipeline(
+        skip_missing=args.skip_missing,
+        chunksize=args.chunksize,
+        incremental=args.incremental
+    )
     success = pipeline.run()
     
     # Exit with appropriate code
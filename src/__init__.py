@@ -5,9 +5,12 @@ LinkedIn Networking Analytics Package
 from .utils import (
     to_snake_case,
     anonymize_text,
+    anonymize_series,
     parse_datetime_column,
     standardize_dataframe,
     save_cleaned_data,
+    save_cleaned_chunks,
+    drop_repeated_rows,
     load_raw_data,
     generate_data_quality_report
 )
@@ -15,9 +18,12 @@ from .utils import (
 __all__ = [
     'to_snake_case',
     'anonymize_text',
+    'anonymize_series',
     'parse_datetime_column',
     'standardize_dataframe',
     'save_cleaned_data',
+    'save_cleaned_chunks',
+    'drop_repeated_rows',
     'load_raw_data',
     'generate_data_quality_report'
 ]
@@ -10,44 +10,43 @@ This dataset represents ENGAGEMENT LAYER:
 
 import sys
 import os
+import re
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from src.utils import (
     load_raw_data,
     standardize_dataframe,
     save_cleaned_data,
+    save_cleaned_chunks,
+    drop_repeated_rows,
     generate_data_quality_report,
     logger
 )
 
+# Column-name patterns (case-insensitive substring match)
+DATETIME_RE = re.compile(r'date|time|created|posted', re.IGNORECASE)
+PII_RE = re.compile(r'url|link|author|commenter|name|comment|text', re.IGNORECASE)
 
-def clean_comments(input_file='Comments.csv', output_file='comments_cleaned.csv'):
-    """
-    Clean and standardize comments data.
-    
-    Expected columns:
-    - Date / Created At
-    - Post / Article URL
-    - Comment text
-    - Author / Commenter
-    """
-    
-    # Load raw data
-    df = load_raw_data(input_file)
+# Columns loaded at all: dates, PII and the comment body - anything else in
+# the export is skipped while parsing
+USED_COLUMN_RE = re.compile(
+    r'date|time|created|posted|url|link|author|commenter|name|comment|text|message',
+    re.IGNORECASE
+)
+
+
+def _is_used_column(col: str) -> bool:
+    return USED_COLUMN_RE.search(col) is not None
+
+
+def _clean_frame(df):
+    """Detect date/PII columns and standardize one dataframe (or chunk)"""
     
     # Identify datetime columns
-    datetime_cols = []
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['date', 'time', 'created', 'posted']):
-            datetime_cols.append(col)
+    datetime_cols = [col for col in df.columns if DATETIME_RE.search(col)]
     
     # Identify columns to anonymize
-    anonymize_cols = []
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['url', 'link', 'author', 'commenter', 'name', 'comment', 'text']):
-            anonymize_cols.append(col)
+    anonymize_cols = [col for col in df.columns if PII_RE.search(col)]
     
     logger.info(f"Detected datetime columns: {datetime_cols}")
     logger.info(f"Detected PII columns to anonymize: {anonymize_cols}")
@@ -60,6 +59,37 @@ def clean_comments(input_file='Comments.csv', output_file='comments_cleaned.csv'
         anonymize_columns=[col for col in anonymize_cols]
     )
     
+    return df_cleaned
+
+
+def clean_comments(input_file='Comments.csv', output_file='comments_cleaned.csv', chunksize=None):
+    """
+    Clean and standardize comments data.
+    
+    Expected columns:
+    - Date / Created At
+    - Post / Article URL
+    - Comment text
+    - Author / Commenter
+    
+    With chunksize set, the file is cleaned and written that many rows at a
+    time and the (rows, columns) shape of the output is returned instead of
+    the dataframe.
+    """
+    
+    if chunksize:
+        # Duplicates split across chunks are dropped before cleaning, as in a full load
+        chunks = drop_repeated_rows(
+            load_raw_data(input_file, usecols=_is_used_column, dtype=str, chunksize=chunksize)
+        )
+        return save_cleaned_chunks(map(_clean_frame, chunks), output_file)
+    
+    # Load raw data - only the used columns, all as strings (nothing here is
+    # numeric, and dates are parsed during standardization)
+    df = load_raw_data(input_file, usecols=_is_used_column, dtype=str)
+    
+    df_cleaned = _clean_frame(df)
+    
     # Generate quality report
     quality_report = generate_data_quality_report(df_cleaned, 'comments')
     logger.info(f"Quality Report: {quality_report}")
@@ -10,45 +10,32 @@ This dataset represents NETWORK GROWTH:
 
 import sys
 import os
+import re
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from src.utils import (
     load_raw_data,
     standardize_dataframe,
     save_cleaned_data,
+    save_cleaned_chunks,
+    drop_repeated_rows,
     generate_data_quality_report,
     logger
 )
 
+# Column-name patterns (case-insensitive substring match)
+DATETIME_RE = re.compile(r'date|connected|time|joined', re.IGNORECASE)
+PII_RE = re.compile(r'name|email|address|url|link', re.IGNORECASE)
 
-def clean_connections(input_file='Connections.csv', output_file='connections_cleaned.csv'):
-    """
-    Clean and standardize connections data.
-    
-    Expected columns:
-    - First Name / Last Name
-    - Email Address
-    - Company
-    - Position
-    - Connected On (timestamp)
-    """
-    
-    # Load raw data
-    df = load_raw_data(input_file)
+
+def _clean_frame(df):
+    """Detect date/PII columns and standardize one dataframe (or chunk)"""
     
     # Identify datetime columns
-    datetime_cols = []
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['date', 'connected', 'time', 'joined']):
-            datetime_cols.append(col)
+    datetime_cols = [col for col in df.columns if DATETIME_RE.search(col)]
     
     # Identify columns to anonymize (PII)
-    anonymize_cols = []
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['name', 'email', 'address', 'url', 'link']):
-            anonymize_cols.append(col)
+    anonymize_cols = [col for col in df.columns if PII_RE.search(col)]
     
     logger.info(f"Detected datetime columns: {datetime_cols}")
     logger.info(f"Detected PII columns to anonymize: {anonymize_cols}")
@@ -61,6 +48,36 @@ def clean_connections(input_file='Connections.csv', output_file='connections_cle
         anonymize_columns=[col for col in anonymize_cols]
     )
     
+    return df_cleaned
+
+
+def clean_connections(input_file='Connections.csv', output_file='connections_cleaned.csv', chunksize=None):
+    """
+    Clean and standardize connections data.
+    
+    Expected columns:
+    - First Name / Last Name
+    - Email Address
+    - Company
+    - Position
+    - Connected On (timestamp)
+    
+    With chunksize set, the file is cleaned and written that many rows at a
+    time and the (rows, columns) shape of the output is returned instead of
+    the dataframe.
+    """
+    
+    if chunksize:
+        # Duplicates split across chunks are dropped before cleaning, as in a full load
+        chunks = drop_repeated_rows(load_raw_data(input_file, dtype=str, chunksize=chunksize))
+        return save_cleaned_chunks(map(_clean_frame, chunks), output_file)
+    
+    # Load raw data - all columns as strings (the export is text and dates are
+    # parsed during standardization), so no type inference pass
+    df = load_raw_data(input_file, dtype=str)
+    
+    df_cleaned = _clean_frame(df)
+    
     # Generate quality report
     quality_report = generate_data_quality_report(df_cleaned, 'connections')
     logger.info(f"Quality Report: {quality_report}")
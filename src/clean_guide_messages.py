@@ -9,38 +9,32 @@ This dataset represents PLATFORM ENGAGEMENT:
 
 import sys
 import os
+import re
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from src.utils import (
     load_raw_data,
     standardize_dataframe,
     save_cleaned_data,
+    save_cleaned_chunks,
+    drop_repeated_rows,
     generate_data_quality_report,
     logger
 )
 
+# Column-name patterns (case-insensitive substring match)
+DATETIME_RE = re.compile(r'date|sent|time|created', re.IGNORECASE)
+PII_RE = re.compile(r'name|sender|url|link|content|message', re.IGNORECASE)
 
-def clean_guide_messages(input_file='guide_messages.csv', output_file='guide_messages_cleaned.csv'):
-    """
-    Clean and standardize guide messages data.
-    """
-    
-    # Load raw data
-    df = load_raw_data(input_file)
+
+def _clean_frame(df):
+    """Detect date/PII columns and standardize one dataframe (or chunk)"""
     
     # Identify datetime columns
-    datetime_cols = []
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['date', 'sent', 'time', 'created']):
-            datetime_cols.append(col)
+    datetime_cols = [col for col in df.columns if DATETIME_RE.search(col)]
     
     # Identify columns to anonymize
-    anonymize_cols = []
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['name', 'sender', 'url', 'link', 'content', 'message']):
-            anonymize_cols.append(col)
+    anonymize_cols = [col for col in df.columns if PII_RE.search(col)]
     
     logger.info(f"Detected datetime columns: {datetime_cols}")
     logger.info(f"Detected PII columns to anonymize: {anonymize_cols}")
@@ -53,6 +47,29 @@ def clean_guide_messages(input_file='guide_messages.csv', output_file='guide_mes
         anonymize_columns=[col for col in anonymize_cols]
     )
     
+    return df_cleaned
+
+
+def clean_guide_messages(input_file='guide_messages.csv', output_file='guide_messages_cleaned.csv', chunksize=None):
+    """
+    Clean and standardize guide messages data.
+    
+    With chunksize set, the file is cleaned and written that many rows at a
+    time and the (rows, columns) shape of the output is returned instead of
+    the dataframe.
+    """
+    
+    if chunksize:
+        # Duplicates split across chunks are dropped before cleaning, as in a full load
+        chunks = drop_repeated_rows(load_raw_data(input_file, dtype=str, chunksize=chunksize))
+        return save_cleaned_chunks(map(_clean_frame, chunks), output_file)
+    
+    # Load raw data - all columns as strings (the export is text and dates are
+    # parsed during standardization), so no type inference pass
+    df = load_raw_data(input_file, dtype=str)
+    
+    df_cleaned = _clean_frame(df)
+    
     # Generate quality report
     quality_report = generate_data_quality_report(df_cleaned, 'guide_messages')
     logger.info(f"Quality Report: {quality_report}")
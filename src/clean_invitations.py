@@ -10,46 +10,32 @@ This dataset represents the TOP OF FUNNEL:
 
 import sys
 import os
+import re
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from src.utils import (
     load_raw_data,
     standardize_dataframe,
     save_cleaned_data,
+    save_cleaned_chunks,
+    drop_repeated_rows,
     generate_data_quality_report,
     logger
 )
 
+# Column-name patterns (case-insensitive substring match)
+DATETIME_RE = re.compile(r'date|sent|time|connected|accepted', re.IGNORECASE)
+PII_RE = re.compile(r'name|email|url|link', re.IGNORECASE)
 
-def clean_invitations(input_file='Invitations.csv', output_file='invitations_cleaned.csv'):
-    """
-    Clean and standardize invitations data.
-    
-    Expected columns (LinkedIn export):
-    - First Name / Last Name (or From)
-    - Company
-    - Position
-    - Sent At / Connected On (timestamps)
-    - Direction (sent/received)
-    - Message (optional)
-    """
-    
-    # Load raw data
-    df = load_raw_data(input_file)
+
+def _clean_frame(df):
+    """Detect date/PII columns and standardize one dataframe (or chunk)"""
     
     # Identify datetime columns (common variations)
-    datetime_cols = []
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['date', 'sent', 'time', 'connected', 'accepted']):
-            datetime_cols.append(col)
+    datetime_cols = [col for col in df.columns if DATETIME_RE.search(col)]
     
     # Identify columns to anonymize (PII)
-    anonymize_cols = []
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['name', 'email', 'url', 'link']):
-            anonymize_cols.append(col)
+    anonymize_cols = [col for col in df.columns if PII_RE.search(col)]
     
     logger.info(f"Detected datetime columns: {datetime_cols}")
     logger.info(f"Detected PII columns to anonymize: {anonymize_cols}")
@@ -68,6 +54,37 @@ def clean_invitations(input_file='Invitations.csv', output_file='invitations_cle
     if direction_cols:
         logger.info(f"Found direction column: {direction_cols[0]}")
     
+    return df_cleaned
+
+
+def clean_invitations(input_file='Invitations.csv', output_file='invitations_cleaned.csv', chunksize=None):
+    """
+    Clean and standardize invitations data.
+    
+    Expected columns (LinkedIn export):
+    - First Name / Last Name (or From)
+    - Company
+    - Position
+    - Sent At / Connected On (timestamps)
+    - Direction (sent/received)
+    - Message (optional)
+    
+    With chunksize set, the file is cleaned and written that many rows at a
+    time and the (rows, columns) shape of the output is returned instead of
+    the dataframe.
+    """
+    
+    if chunksize:
+        # Duplicates split across chunks are dropped before cleaning, as in a full load
+        chunks = drop_repeated_rows(load_raw_data(input_file, dtype=str, chunksize=chunksize))
+        return save_cleaned_chunks(map(_clean_frame, chunks), output_file)
+    
+    # Load raw data - all columns as strings (the export is text and dates are
+    # parsed during standardization), so no type inference pass
+    df = load_raw_data(input_file, dtype=str)
+    
+    df_cleaned = _clean_frame(df)
+    
     # Generate quality report
     quality_report = generate_data_quality_report(df_cleaned, 'invitations')
     logger.info(f"Quality Report: {quality_report}")
@@ -11,18 +11,44 @@ This dataset represents MID-FUNNEL ENGAGEMENT:
 
 import sys
 import os
+import re
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from src.utils import (
     load_raw_data,
     standardize_dataframe,
     save_cleaned_data,
+    save_cleaned_chunks,
+    drop_repeated_rows,
     generate_data_quality_report,
     logger
 )
 
 
+# Column-name patterns (case-insensitive substring match)
+DATETIME_RE = re.compile(r'date|sent|time|created', re.IGNORECASE)
+PII_RE = re.compile(r'name|sender|title|url|link', re.IGNORECASE)
+CONTENT_RE = re.compile(r'content|message|text', re.IGNORECASE)
+
+# Outcome flag column -> keyword alternation
+OUTCOME_KEYWORDS = {
+    'has_referral_keyword': r'referral|refer you|introduction|connect you',
+    'has_interview_keyword': r'interview|call|meeting|chat|zoom|coffee',
+    'has_positive_keyword': r'thank|appreciate|helpful|great|perfect|awesome',
+    'has_negative_keyword': r'not interested|no thanks|busy|not at this time',
+}
+
+# Match options built once at import; case-insensitive, so the text is never lowercased
+OUTCOME_MATCH_OPTIONS = {
+    col: pc.MatchSubstringOptions(pattern, ignore_case=True)
+    for col, pattern in OUTCOME_KEYWORDS.items()
+}
+
+
 def extract_outcome_keywords(df: pd.DataFrame, text_col: str) -> pd.DataFrame:
     """
     Extract outcome signals from message content.
@@ -32,68 +58,49 @@ def extract_outcome_keywords(df: pd.DataFrame, text_col: str) -> pd.DataFrame:
     - Interview: 'interview', 'call', 'meeting', 'chat', 'zoom'
     - Positive: 'thank', 'appreciate', 'helpful', 'great'
     - Negative: 'not interested', 'no thanks', 'busy'
+    
+    Matching runs in Arrow's RE2 engine (a linear-time automaton, no
+    backtracking) over the whole column, one scan per flag.
     """
     
     if text_col not in df.columns:
         logger.warning(f"Text column '{text_col}' not found")
         return df
     
-    # Convert to lowercase for matching
-    text_lower = df[text_col].fillna('').astype(str).str.lower()
+    # Converted as-is (no fillna/astype(str) copies); missing text stays null
+    text = pa.array(df[text_col], from_pandas=True)
+    if not pa.types.is_string(text.type):
+        text = text.cast(pa.string())
     
-    # Outcome flags
-    df['has_referral_keyword'] = text_lower.str.contains(
-        r'referral|refer you|introduction|connect you', regex=True
-    ).astype(int)
+    # Outcome flags (0/1, stored as int8); null text counts as no match
+    flags = {}
+    for col, options in OUTCOME_MATCH_OPTIONS.items():
+        matched = pc.fill_null(pc.match_substring_regex(text, options=options), False)
+        flags[col] = matched.to_numpy(zero_copy_only=False).astype(np.int8)
+    flags = pd.DataFrame(flags, index=df.index)
     
-    df['has_interview_keyword'] = text_lower.str.contains(
-        r'interview|call|meeting|chat|zoom|coffee', regex=True
-    ).astype(int)
-    
-    df['has_positive_keyword'] = text_lower.str.contains(
-        r'thank|appreciate|helpful|great|perfect|awesome', regex=True
-    ).astype(int)
-    
-    df['has_negative_keyword'] = text_lower.str.contains(
-        r'not interested|no thanks|busy|not at this time', regex=True
-    ).astype(int)
+    # Added as one int8 block - per-column inserts fragment the frame
+    existing = df.columns.intersection(flags.columns)
+    if len(existing):
+        df = df.drop(columns=existing)
+    df = pd.concat([df, flags], axis=1, copy=False)
     
     logger.info(f"Extracted outcome keywords from {text_col}")
     
     return df
 
 
-def clean_messages(input_file='messages.csv', output_file='messages_cleaned.csv'):
-    """
-    Clean and standardize messages data.
-    
-    Expected columns:
-    - CONVERSATION ID / Thread ID
-    - CONVERSATION TITLE / From
-    - DATE / Sent At
-    - SENDER / From Name
-    - CONTENT / Message
-    """
-    
-    # Load raw data
-    df = load_raw_data(input_file)
+def _clean_frame(df):
+    """Detect date/PII columns and standardize one dataframe (or chunk)"""
     
     # Identify datetime columns
-    datetime_cols = []
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['date', 'sent', 'time', 'created']):
-            datetime_cols.append(col)
+    datetime_cols = [col for col in df.columns if DATETIME_RE.search(col)]
     
     # Identify columns to anonymize (PII)
-    anonymize_cols = []
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['name', 'sender', 'title', 'url', 'link']):
-            anonymize_cols.append(col)
+    anonymize_cols = [col for col in df.columns if PII_RE.search(col)]
     
     # Don't anonymize CONTENT/MESSAGE yet (need for keyword extraction)
-    content_cols = [col for col in df.columns if any(x in col.lower() for x in ['content', 'message', 'text'])]
+    content_cols = [col for col in df.columns if CONTENT_RE.search(col)]
     anonymize_cols = [col for col in anonymize_cols if col not in content_cols]
     
     logger.info(f"Detected datetime columns: {datetime_cols}")
@@ -110,16 +117,46 @@ def clean_messages(input_file='messages.csv', output_file='messages_cleaned.csv'
     
     # Extract outcome keywords from content
     if content_cols:
-        content_col_snake = [col for col in df_cleaned.columns if any(x in col for x in ['content', 'message', 'text'])]
+        content_col_snake = [col for col in df_cleaned.columns if CONTENT_RE.search(col)]
         if content_col_snake:
             df_cleaned = extract_outcome_keywords(df_cleaned, content_col_snake[0])
             
             # Now anonymize the content
-            from src.utils import anonymize_text
-            df_cleaned[f'{content_col_snake[0]}_hash'] = df_cleaned[content_col_snake[0]].apply(anonymize_text)
+            from src.utils import anonymize_series
+            df_cleaned[f'{content_col_snake[0]}_hash'] = anonymize_series(df_cleaned[content_col_snake[0]])
             df_cleaned = df_cleaned.drop(columns=[content_col_snake[0]])
             logger.info(f"Anonymized content column after keyword extraction")
     
+    return df_cleaned
+
+
+def clean_messages(input_file='messages.csv', output_file='messages_cleaned.csv', chunksize=None):
+    """
+    Clean and standardize messages data.
+    
+    Expected columns:
+    - CONVERSATION ID / Thread ID
+    - CONVERSATION TITLE / From
+    - DATE / Sent At
+    - SENDER / From Name
+    - CONTENT / Message
+    
+    With chunksize set, the file is cleaned and written that many rows at a
+    time and the (rows, columns) shape of the output is returned instead of
+    the dataframe.
+    """
+    
+    if chunksize:
+        # Duplicates split across chunks are dropped before cleaning, as in a full load
+        chunks = drop_repeated_rows(load_raw_data(input_file, dtype=str, chunksize=chunksize))
+        return save_cleaned_chunks(map(_clean_frame, chunks), output_file)
+    
+    # Load raw data - all columns as strings (the export is text and dates are
+    # parsed during standardization), so no type inference pass
+    df = load_raw_data(input_file, dtype=str)
+    
+    df_cleaned = _clean_frame(df)
+    
     # Generate quality report
     quality_report = generate_data_quality_report(df_cleaned, 'messages')
     logger.info(f"Quality Report: {quality_report}")
@@ -3,11 +3,18 @@ LinkedIn Networking Analytics - Utility Functions
 Provides standardized data cleaning and transformation utilities.
 """
 
+import codecs
+import csv
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 import hashlib
 import re
 from datetime import datetime
-from typing import Optional, List
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Optional, List, Tuple, Union
 import logging
 
 # Configure logging
@@ -17,7 +24,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Timestamp formats tried by parse_datetime_column, most common first
+DATETIME_FORMATS = [
+    'ISO8601',               # 2024-01-10 10:00:00, 2024-01-10T10:00:00Z
+    '%d %b %Y',              # Connections.csv: 01 Mar 2024
+    '%m/%d/%y, %I:%M %p',    # Invitations.csv: 1/10/24, 10:00 AM
+]
 
+# Bytes per PyArrow CSV parsing block (blocks are parsed in parallel)
+ARROW_BLOCK_SIZE = 32 << 20
+
+# to_snake_case patterns, compiled once
+SNAKE_SEPARATOR_RE = re.compile(r'[\s\-]+')
+SNAKE_CAMEL_RE = re.compile(r'([a-z0-9])([A-Z])')
+
+
+@lru_cache(maxsize=2048)
 def to_snake_case(name: str) -> str:
     """
     Convert column name to snake_case.
@@ -26,11 +48,13 @@ def to_snake_case(name: str) -> str:
         'FirstName' -> 'first_name'
         'CONVERSATION ID' -> 'conversation_id'
         'Date-Sent' -> 'date_sent'
+    
+    Results are cached - the same headers recur in every file and chunk.
     """
     # Replace spaces and hyphens with underscores
-    name = re.sub(r'[\s\-]+', '_', name)
+    name = SNAKE_SEPARATOR_RE.sub('_', name)
     # Insert underscore before uppercase letters
-    name = re.sub('([a-z0-9])([A-Z])', r'\1_\2', name)
+    name = SNAKE_CAMEL_RE.sub(r'\1_\2', name)
     # Convert to lowercase
     return name.lower()
 
@@ -49,15 +73,65 @@ def anonymize_text(text: str, hash_length: int = 8) -> str:
     if pd.isna(text) or text == '':
         return text
     
-    # Create SHA256 hash
-    hash_object = hashlib.sha256(str(text).encode())
+    # Create SHA256 hash (strings are encoded directly, without a str() copy)
+    data = text.encode('utf-8') if isinstance(text, str) else str(text).encode()
+    hash_object = hashlib.sha256(data)
     return hash_object.hexdigest()[:hash_length]
 
 
+def anonymize_series(series: pd.Series, hash_length: int = 8) -> pd.Series:
+    """
+    Hash a whole column, giving the same values as anonymize_text per cell.
+    
+    The column is factorized first, so each distinct value is hashed once and
+    the digests are broadcast back to the rows with one array take. Empty
+    strings are left as-is and nulls come back as None.
+    
+    Args:
+        series: Column to anonymize
+        hash_length: Length of hash to return (default 8)
+    
+    Returns:
+        Series of hashed strings (same index)
+    """
+    # Hash-based factorize: O(rows), and unlike np.unique it needs no sort
+    # (which fails on mixed-type object columns)
+    codes, uniques = pd.factorize(series)
+    digests = np.array([
+        value if value == '' else hashlib.sha256(str(value).encode()).hexdigest()[:hash_length]
+        for value in uniques
+    ] + [None], dtype=object)
+    
+    # Null rows (code -1) take the trailing None - no copy of the input column
+    return pd.Series(digests[codes], index=series.index, name=series.name)
+
+
+def _sniff_datetime_format(series: pd.Series, sample_size: int = 50) -> Optional[str]:
+    """
+    Pick the format (from DATETIME_FORMATS) that parses most of a sample of
+    the column's values, or None if none of them parses anything.
+    """
+    sample = series.dropna().head(sample_size)
+    
+    best_format, best_count = None, 0
+    for fmt in DATETIME_FORMATS:
+        count = pd.to_datetime(sample, format=fmt, errors='coerce').count()
+        if count > best_count:
+            best_format, best_count = fmt, count
+        if count == len(sample):
+            break
+    
+    return best_format
+
+
 def parse_datetime_column(series: pd.Series, column_name: str) -> pd.Series:
     """
     Parse datetime columns with flexible format detection.
     
+    The format is sniffed from a sample of values and the whole column is
+    parsed with it in one vectorized pass; values in any other format fall
+    back to pandas' automatic parsing.
+    
     Args:
         series: Pandas series containing datetime strings
         column_name: Name of column (for logging)
@@ -66,8 +140,21 @@ def parse_datetime_column(series: pd.Series, column_name: str) -> pd.Series:
         Pandas series with datetime objects
     """
     try:
-        # Try pandas automatic parsing first
-        parsed = pd.to_datetime(series, errors='coerce')
+        values, utc = series, False
+        sample = series.dropna().head(50)
+        if len(sample) and sample.astype(str).str.endswith(' UTC').all():
+            # Message exports end every timestamp in " UTC" - parse the rest and
+            # mark the result as UTC (strptime's %Z path is ~30x slower)
+            values, utc = series.str.removesuffix(' UTC'), True
+        
+        fmt = _sniff_datetime_format(values)
+        if fmt is not None:
+            # Repeated timestamps are parsed once (cache=True)
+            parsed = pd.to_datetime(values, format=fmt, errors='coerce', utc=utc, cache=True)
+        
+        # No known format, or values it couldn't read - use automatic parsing
+        if fmt is None or parsed.count() < series.count():
+            parsed = pd.to_datetime(series, errors='coerce')
         
         # Log parsing success rate
         success_rate = (parsed.notna().sum() / len(series)) * 100
@@ -113,80 +200,238 @@ def standardize_dataframe(
     df.columns = [to_snake_case(col) for col in df.columns]
     logger.info(f"Converted columns to snake_case: {list(df.columns)}")
     
+    # Column lists may use the raw header names - match them to the renamed columns
+    datetime_columns = [to_snake_case(col) for col in datetime_columns or []]
+    anonymize_columns = [to_snake_case(col) for col in anonymize_columns or []]
+    
     # 2. Parse datetime columns
     if datetime_columns:
         for col in datetime_columns:
             if col in df.columns:
                 df[col] = parse_datetime_column(df[col], col)
     
-    # 3. Remove completely empty rows
+    # 3. Remove completely empty rows (in place - no new frame)
     initial_rows = len(df)
-    df = df.dropna(how='all')
+    df.dropna(how='all', inplace=True)
     removed_rows = initial_rows - len(df)
     if removed_rows > 0:
         logger.info(f"Removed {removed_rows} completely empty rows")
     
-    # 4. Deduplicate
+    # 4. Deduplicate, renumbering the index in the same pass (nothing below
+    # removes rows). Done before anonymization so that rows differing only
+    # in PII are never merged by a truncated-hash collision.
     initial_rows = len(df)
-    df = df.drop_duplicates()
+    df.drop_duplicates(inplace=True, ignore_index=True)
     duplicates = initial_rows - len(df)
     if duplicates > 0:
         logger.info(f"Removed {duplicates} duplicate rows")
     
     # 5. Anonymize sensitive columns
     if anonymize_columns:
-        for col in anonymize_columns:
-            if col in df.columns:
-                df[f'{col}_hash'] = df[col].apply(anonymize_text)
-                df = df.drop(columns=[col])
-                logger.info(f"Anonymized column: {col}")
+        hashed_cols = [col for col in anonymize_columns if col in df.columns]
+        for col in hashed_cols:
+            df[f'{col}_hash'] = anonymize_series(df[col])
+            logger.info(f"Anonymized column: {col}")
+        # One drop for all originals (each drop copies the frame)
+        df = df.drop(columns=hashed_cols)
     
     # 6. Add source table column
     df['source_table'] = source_name
     
-    # Reset index
-    df = df.reset_index(drop=True)
-    
     logger.info(f"Final shape: {df.shape}")
     logger.info(f"Standardization complete for {source_name}\n")
     
     return df
 
 
-def save_cleaned_data(df: pd.DataFrame, filename: str, output_dir: str = 'data/cleaned'):
+def save_cleaned_data(
+    df: pd.DataFrame,
+    filename: str,
+    output_dir: str = 'data/cleaned',
+    format: str = 'csv'
+):
     """
-    Save cleaned dataframe to CSV.
+    Save cleaned dataframe to CSV (plus a Parquet copy) or to Parquet only.
+    
+    With format='csv' the dashboard loads the Parquet copy when it is at
+    least as new as the CSV, so it never has to re-parse the CSV itself.
+    With format='parquet' the .csv suffix of filename is replaced and only
+    the Parquet file is written (typed columns, nothing to re-parse when a
+    later stage loads it with load_raw_data).
     
     Args:
         df: Cleaned dataframe
         filename: Output filename (without path)
         output_dir: Output directory
+        format: 'csv' or 'parquet'
     """
     import os
     
+    if format not in ('csv', 'parquet'):
+        raise ValueError(f"Unsupported format: {format}")
+    
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
     # Construct full path
     filepath = os.path.join(output_dir, filename)
+    parquet_path = os.path.splitext(filepath)[0] + '.parquet'
+    
+    def write_parquet(path):
+        df.to_parquet(path, engine='pyarrow', compression='snappy', index=False)
+    
+    if format == 'parquet':
+        _write_atomically(parquet_path, write_parquet)
+        logger.info(f"Saved cleaned data to: {parquet_path}")
+        return parquet_path
     
     # Save to CSV
-    df.to_csv(filepath, index=False)
+    _write_atomically(filepath, lambda path: df.to_csv(path, index=False))
     logger.info(f"Saved cleaned data to: {filepath}")
     
+    # Save Parquet copy (written after the CSV so it is never older than it)
+    try:
+        _write_atomically(parquet_path, write_parquet)
+        logger.info(f"Saved Parquet copy to: {parquet_path}")
+    except (ImportError, OSError, ValueError, TypeError) as e:
+        # Mixed-type object columns can't be stored; the CSV is still complete
+        logger.warning(f"Could not write Parquet copy {parquet_path}: {e}")
+    
     return filepath
 
 
-def load_raw_data(filename: str, input_dir: str = 'data/raw') -> pd.DataFrame:
+def _write_atomically(filepath: str, write: Callable[[str], None]):
+    """
+    Call write(path) on a temporary file next to filepath and move it into
+    place once it is complete. If write fails the temporary file is removed
+    and any existing filepath is left untouched.
+    """
+    import os
+    
+    tmp_path = filepath + '.tmp'
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def drop_repeated_rows(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Drop rows that already appeared in an earlier chunk, comparing the raw
+    rows as loaded (before cleaning, so before any PII is hashed).
+    
+    standardize_dataframe removes duplicates within each chunk; this handles
+    the ones split across chunks. Rows are matched by a 64-bit hash of their
+    values, and the sorted hashes of every distinct row seen so far are kept,
+    so memory still grows with the file - 8 bytes per distinct row rather
+    than the row itself. Chunks with no new rows are skipped.
+    """
+    seen = np.empty(0, dtype=np.uint64)
+    for chunk in chunks:
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        repeated = _in_sorted(seen, hashes)
+        
+        # Merge only the new distinct hashes into the sorted array
+        fresh = np.unique(hashes[~repeated])
+        seen = np.insert(seen, np.searchsorted(seen, fresh), fresh)
+        
+        if not repeated.any():
+            yield chunk
+        elif not repeated.all():
+            # A copy, not a view, as the cleaners modify the frame in place
+            yield chunk[~repeated].copy()
+
+
+def _in_sorted(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Boolean mask of which values are present in sorted_values"""
+    if len(sorted_values) == 0:
+        return np.zeros(len(values), dtype=bool)
+    positions = np.searchsorted(sorted_values, values)
+    positions[positions == len(sorted_values)] = 0
+    return sorted_values[positions] == values
+
+
+def save_cleaned_chunks(
+    chunks: Iterable[pd.DataFrame],
+    filename: str,
+    output_dir: str = 'data/cleaned'
+) -> Tuple[int, int]:
+    """
+    Write cleaned chunks to one CSV as they arrive, without holding the whole
+    dataset in memory.
+    
+    Like save_cleaned_data, the output is replaced only once every chunk is
+    written, so a failed run leaves the previous output intact. The Parquet
+    copy of the previous output is removed (none is written here - the
+    dashboard builds its own from the CSV). With no chunks at all an empty
+    file is still written.
+    
+    Args:
+        chunks: Cleaned dataframes, all with the same columns (see
+            drop_repeated_rows for duplicates across chunks)
+        filename: Output filename (without path)
+        output_dir: Output directory
+    
+    Returns:
+        (rows, columns) of the written data
+    """
+    import os
+    
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, filename)
+    
+    rows, columns = 0, 0
+    
+    def write_chunks(path):
+        nonlocal rows, columns
+        # Opened up front so an empty iterable still produces a file
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, header=i == 0, index=False)
+                rows += len(chunk)
+                columns = len(chunk.columns)
+    
+    _write_atomically(filepath, write_chunks)
+    
+    # A Parquet copy of the previous output no longer matches the CSV
+    parquet_path = os.path.splitext(filepath)[0] + '.parquet'
+    if os.path.exists(parquet_path):
+        os.remove(parquet_path)
+    
+    logger.info(f"Saved {rows} cleaned rows to: {filepath}")
+    
+    return rows, columns
+
+
+def load_raw_data(
+    filename: str,
+    input_dir: str = 'data/raw',
+    usecols: Optional[Union[List[str], Callable[[str], bool]]] = None,
+    dtype=None,
+    chunksize: Optional[int] = None
+) -> Union[pd.DataFrame, Iterable[pd.DataFrame]]:
     """
     Load raw CSV data with error handling.
     
+    A .parquet filename (e.g. output of save_cleaned_data(format='parquet'))
+    is read directly, with its stored types.
+    
     Args:
         filename: Input filename
         input_dir: Input directory
+        usecols: Columns to load - a list of names, or a callable that is
+            given each header name (as in pd.read_csv). Other columns are
+            skipped while parsing. Default loads every column.
+        dtype: Type for all columns, or a {column: type} dict, as in
+            pd.read_csv (skips type inference for those columns)
+        chunksize: If given, return an iterator of dataframes of up to this
+            many rows instead of loading the whole CSV
     
     Returns:
-        Pandas dataframe
+        Pandas dataframe (an iterator of them when chunksize is set)
     """
     import os
     
@@ -197,13 +442,165 @@ def load_raw_data(filename: str, input_dir: str = 'data/raw') -> pd.DataFrame:
     
     logger.info(f"Loading data from: {filepath}")
     
+    if filepath.endswith('.parquet'):
+        df = _read_parquet(filepath, usecols, dtype)
+        logger.info(f"Loaded {len(df)} rows, {len(df.columns)} columns")
+        return df
+    
+    if chunksize:
+        return _iter_csv_chunks(filepath, usecols, dtype, chunksize)
+    
+    try:
+        # Fast path: PyArrow's multi-threaded parser
+        df = _read_csv_arrow(filepath, usecols, dtype)
+    except pa.ArrowInvalid as e:
+        # Note rows, ragged lines or non-UTF-8 text - use the pandas readers below
+        logger.warning(f"PyArrow parsing failed, falling back to pandas: {e}")
+        df = _read_csv_pandas(filepath, usecols, dtype)
+    
+    logger.info(f"Loaded {len(df)} rows, {len(df.columns)} columns")
+    
+    return df
+
+
+def _read_parquet(filepath: str, usecols=None, dtype=None) -> pd.DataFrame:
+    """Read a Parquet file, with the same usecols/dtype meaning as for CSV"""
+    columns = None
+    if usecols is not None:
+        names = pq.read_schema(filepath).names
+        if callable(usecols):
+            columns = [col for col in names if usecols(col)]
+        else:
+            columns = [col for col in names if col in set(usecols)]
+    
+    df = pd.read_parquet(filepath, engine='pyarrow', columns=columns)
+    
+    if dtype is not None:
+        if isinstance(dtype, dict):
+            dtype = {col: t for col, t in dtype.items() if col in df.columns}
+        df = df.astype(dtype)
+    
+    return df
+
+
+def _read_csv_arrow(
+    filepath: str,
+    usecols=None,
+    dtype=None,
+    block_size: int = ARROW_BLOCK_SIZE
+) -> pd.DataFrame:
+    """
+    Load a CSV with PyArrow and convert it to pandas in place.
+    
+    Quoted values may span lines (message CONTENT does), including across
+    block boundaries. Raises pyarrow.ArrowInvalid when the file can't be
+    parsed as a plain UTF-8 CSV, so the caller can fall back to pandas.
+    """
+    convert_options = pv.ConvertOptions(strings_can_be_null=True)
+    skip_rows = _count_note_rows(filepath)
+    
+    if usecols is not None or dtype is not None:
+        # Arrow needs the selected column names up front
+        try:
+            with open(filepath, newline='', encoding='utf-8-sig') as f:
+                lines = iter(f)
+                for _ in range(skip_rows):
+                    next(lines, None)
+                header = next((row for row in csv.reader(lines) if row), [])
+        except UnicodeDecodeError as e:
+            raise pa.ArrowInvalid(f"CSV is not valid UTF-8: {e}")
+        
+        if usecols is None:
+            columns = header
+        elif callable(usecols):
+            columns = [col for col in header if usecols(col)]
+        else:
+            columns = [col for col in header if col in usecols]
+        if not columns:
+            # e.g. a LinkedIn notes line read as the header
+            raise pa.ArrowInvalid(f"No selected columns in header: {header}")
+        
+        convert_options.include_columns = columns
+        if dtype is not None:
+            types = dtype if isinstance(dtype, dict) else dict.fromkeys(columns, dtype)
+            convert_options.column_types = {
+                col: pa.from_numpy_dtype(np.dtype(t)) for col, t in types.items() if col in columns
+            }
+    
+    table = pv.read_csv(
+        filepath,
+        read_options=pv.ReadOptions(skip_rows=skip_rows, block_size=block_size),
+        # Without this a multi-line value cut by a block boundary fails to parse
+        parse_options=pv.ParseOptions(newlines_in_values=True),
+        convert_options=convert_options
+    )
+    
+    # Non-UTF-8 text comes back as binary columns instead of an error
+    if any(pa.types.is_binary(field.type) for field in table.schema):
+        raise pa.ArrowInvalid("CSV is not valid UTF-8")
+    
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def _count_note_rows(filepath: str) -> int:
+    """
+    Number of lines to skip for LinkedIn's "Notes:" preamble (0 if absent).
+    
+    Some exports (e.g. Connections.csv) start with a "Notes:" line and a
+    one-line quoted note before the real header.
+    """
+    with open(filepath, 'rb') as f:
+        first = f.readline()
+    return 2 if first.lstrip(b'\xef\xbb\xbf').strip().lower().startswith(b'notes') else 0
+
+
+def _iter_csv_chunks(filepath: str, usecols=None, dtype=None, chunksize: int = 100_000):
+    """
+    Read a CSV as an iterator of dataframes of up to chunksize rows.
+    
+    The encoding is settled before the first chunk (a streaming UTF-8 check)
+    so a latin-1 export doesn't fail part-way through.
+    """
+    encoding = 'utf-8-sig' if _is_utf8(filepath) else 'latin-1'
+    return pd.read_csv(
+        filepath,
+        encoding=encoding,
+        skiprows=_count_note_rows(filepath),
+        usecols=usecols,
+        dtype=dtype,
+        chunksize=chunksize,
+        low_memory=False
+    )
+
+
+def _is_utf8(filepath: str) -> bool:
+    """Whether the whole file decodes as UTF-8, read in 1 MiB blocks"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(filepath, 'rb') as f:
+        try:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def _read_csv_pandas(filepath: str, usecols=None, dtype=None) -> pd.DataFrame:
+    """
+    Load a CSV with pandas, retrying other encodings and skipping LinkedIn's
+    header notes when the standard load fails.
+    """
     try:
         # First attempt: standard load
-        df = pd.read_csv(filepath, encoding='utf-8')
+        df = pd.read_csv(filepath, encoding='utf-8', usecols=usecols, dtype=dtype, low_memory=False)
+        if usecols is not None and len(df.columns) == 0:
+            # Nothing selected - a notes line was read as the header
+            raise ValueError("No selected columns in header")
     except UnicodeDecodeError:
         # Try alternative encodings
         logger.warning("UTF-8 failed, trying latin-1 encoding")
-        df = pd.read_csv(filepath, encoding='latin-1')
+        df = pd.read_csv(filepath, encoding='latin-1', usecols=usecols, dtype=dtype, low_memory=False)
     except Exception as e:
         # If parsing fails, try skipping initial rows (LinkedIn often has notes)
         logger.warning(f"Standard parsing failed: {e}")
@@ -215,7 +612,10 @@ def load_raw_data(filename: str, input_dir: str = 'data/raw') -> pd.DataFrame:
                 filepath, 
                 encoding='utf-8',
                 skiprows=2,  # Skip LinkedIn's note section
-                on_bad_lines='skip'
+                on_bad_lines='skip',
+                usecols=usecols,
+                dtype=dtype,
+                low_memory=False
             )
         except:
             # Last resort: try with different quoting
@@ -224,33 +624,39 @@ def load_raw_data(filename: str, input_dir: str = 'data/raw') -> pd.DataFrame:
                 encoding='utf-8',
                 skiprows=2,
                 quotechar='"',
-                on_bad_lines='skip'
+                on_bad_lines='skip',
+                usecols=usecols,
+                dtype=dtype,
+                low_memory=False
             )
     
-    logger.info(f"Loaded {len(df)} rows, {len(df.columns)} columns")
-    
     return df
 
 
-def generate_data_quality_report(df: pd.DataFrame, name: str) -> dict:
+def generate_data_quality_report(df: pd.DataFrame, name: str, expensive: bool = False) -> dict:
     """
     Generate data quality metrics for a dataframe.
     
     Args:
         df: Input dataframe
         name: Dataset name
+        expensive: Measure memory deeply (sizes every string in object
+            columns); default counts only the column buffers
     
     Returns:
         Dictionary with quality metrics
     """
+    # One null scan serves both counts and percentages
+    nulls = df.isnull().sum()
+    
     report = {
         'dataset': name,
         'total_rows': len(df),
         'total_columns': len(df.columns),
-        'null_counts': df.isnull().sum().to_dict(),
-        'null_percentages': (df.isnull().sum() / len(df) * 100).to_dict(),
-        'duplicate_rows': df.duplicated().sum(),
-        'memory_usage_mb': df.memory_usage(deep=True).sum() / 1024 / 1024
+        'null_counts': nulls.to_dict(),
+        'null_percentages': (nulls / max(len(df), 1) * 100).to_dict(),
+        'duplicate_rows': int(df.duplicated().sum()),
+        'memory_usage_mb': float(df.memory_usage(index=False, deep=expensive).sum()) / 1024 / 1024
     }
     
     return report